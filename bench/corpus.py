@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Seed corpus of real-world OpenURLs (WorldCat, EBSCO, Summon, Google Scholar,
+FirstSearch, ...) pulled from the query strings in the test suite.
+"""
+
+import __future__
+import io, os, re
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test')
+TEST_FILES = ('openurl.py', 'ris.py')
+
+#Single line `q = '...'` / `qstring = '...'` assignments.
+QUERY_LINE = re.compile(r"^\s*(?:q|qstring)\s*=\s*('.*')\s*$", re.MULTILINE)
+
+
+def load():
+    """
+    Return the list of unique test suite query strings, in file order.
+    """
+    out = []
+    seen = set()
+    for name in TEST_FILES:
+        with io.open(os.path.join(TEST_DIR, name), encoding='utf-8') as f:
+            source = f.read()
+        for literal in QUERY_LINE.findall(source):
+            code = compile(literal, name, 'eval', __future__.unicode_literals.compiler_flag, True)
+            q = eval(code)
+            if q not in seen:
+                seen.add(q)
+                out.append(q)
+    return out
+
+#Numbers varied by synthetic(); percent escapes are matched first so
+#they are left alone.
+DIGITS = re.compile(r'%[0-9A-Fa-f]{2}|(\d+)')
+
+
+def synthetic(n, seed=0, queries=None):
+    """
+    Yield n OpenURLs made by varying the seed corpus: numbers (volume,
+    pages, dates, ids) are changed, keys swap between their rft. and bare
+    forms, key order is shuffled and titles get a record number.  Queries
+    are generated one at a time so n can run to millions.
+    """
+    import random
+    rand = random.Random(seed)
+    queries = queries or load()
+    split = [q.split('&') for q in queries]
+    def renumber(match):
+        if match.group(1) is None:
+            return match.group()
+        return str(rand.randint(1, 10 ** len(match.group())))
+    for i in xrange(n):
+        pairs = []
+        for pair in split[i % len(split)]:
+            k, sep, v = pair.partition('=')
+            if k.startswith('rft.') and rand.random() < 0.2:
+                k = k[4:]
+            if 'title' in k:
+                v = '%s+%d' % (v, i)
+            elif rand.random() < 0.5:
+                v = DIGITS.sub(renumber, v)
+            pairs.append(k + sep + v)
+        rand.shuffle(pairs)
+        yield '&'.join(pairs)
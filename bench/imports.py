@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Time imports in fresh interpreters, as a short-lived CLI run or
+serverless invocation pays them.  Run from the repository root:
+
+    python -m bench.imports
+    python -m bench.imports --repeat 20
+
+Timings are milliseconds, best of --repeat interpreters.
+"""
+
+import argparse, os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = (
+    'import bibjsontools',
+    'from bibjsontools import from_openurl',
+    'from bibjsontools import ris',
+    'from bibjsontools import cli',
+    )
+
+TIMER = 'import time; start = time.time(); %s; print(time.time() - start)'
+
+
+def time_import(statement, repeat=10):
+    """
+    Best time in milliseconds for statement in a new interpreter.
+    """
+    best = None
+    for i in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', TIMER % statement], cwd=ROOT)
+        seconds = float(out.strip())
+        if (best is None) or (seconds < best):
+            best = seconds
+    return best * 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='bibjsontools import-time benchmark')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+    for statement in STATEMENTS:
+        print('%-40s %8.2f ms' % (statement, time_import(statement, args.repeat)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
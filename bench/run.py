@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Benchmark the conversions on the test suite corpus plus synthetic records.
+Run from the repository root:
+
+    python -m bench.run                 # print timings
+    python -m bench.run --compare      # ... and compare to bench/baseline.json
+    python -m bench.run --save         # record a new baseline
+
+Timings are microseconds per record, best of --repeat runs.
+"""
+
+import argparse, io, json, os, platform, sys, timeit
+
+try:
+    from urlparse import parse_qs
+except ImportError:
+    from cgi import parse_qs
+
+from bench import corpus
+from bibjsontools import jsonl, ris
+from bibjsontools.kev import tokenize
+from bibjsontools.openurl import WANTED_KEYS, from_dict, from_openurl, to_openurl
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+#Slower than the baseline by more than this fraction is flagged.
+TOLERANCE = 0.25
+
+
+#Fields a request router needs.
+ROUTING = ('type', 'identifier')
+
+def benchmarks(queries):
+    """
+    name => function running one operation over every record.
+    """
+    dicts = [parse_qs(q) for q in queries]
+    bibs = [from_openurl(q) for q in queries]
+    maker = ris.RISMaker()
+    return {
+        'parse_qs': lambda: [parse_qs(q) for q in queries],
+        'kev.tokenize': lambda: [tokenize(q, WANTED_KEYS) for q in queries],
+        'from_openurl': lambda: [from_openurl(q) for q in queries],
+        'from_openurl.routing': lambda: [from_openurl(q, fields=ROUTING) for q in queries],
+        'from_dict': lambda: [from_dict(d) for d in dicts],
+        'to_openurl': lambda: [to_openurl(b) for b in bibs],
+        'json.dumps': lambda: [json.dumps(b) for b in bibs],
+        'jsonl.dumps': lambda: [jsonl.dumps(b) for b in bibs],
+        'ris.convert': lambda: [ris.convert(b) for b in bibs],
+        'RISMaker': lambda: [maker.convert_to_ris(b) for b in bibs],
+    }
+
+def run(records=1000, number=5, repeat=3, seed=0):
+    """
+    Time each benchmark over the corpus plus synthetic records.
+    Returns name => microseconds per record.
+    """
+    queries = corpus.load()
+    queries += list(corpus.synthetic(max(records - len(queries), 0), seed, queries))
+    out = {}
+    for name, func in sorted(benchmarks(queries).items()):
+        best = min(timeit.repeat(func, number=number, repeat=repeat))
+        out[name] = round(best / (number * len(queries)) * 1e6, 2)
+    return out
+
+def compare(results, baseline):
+    """
+    Lines describing each result against the baseline, and the regressions.
+    """
+    lines = []
+    regressions = []
+    for name in sorted(results):
+        base = baseline.get(name)
+        if base:
+            change = (results[name] - base) / base
+            flag = ''
+            if change > TOLERANCE:
+                flag = '  REGRESSION'
+                regressions.append(name)
+            lines.append('%-20s %8.2f us  (baseline %8.2f, %+.0f%%)%s' % (name, results[name], base, change * 100, flag))
+        else:
+            lines.append('%-20s %8.2f us' % (name, results[name]))
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='bibjsontools benchmarks')
+    parser.add_argument('--records', type=int, default=1000,
+                        help='corpus size, padded with synthetic records')
+    parser.add_argument('--number', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', action='store_true', help='write %s' % BASELINE)
+    parser.add_argument('--compare', action='store_true', help='compare to %s' % BASELINE)
+    args = parser.parse_args(argv)
+    results = run(args.records, args.number, args.repeat)
+    baseline = {}
+    if args.compare:
+        with io.open(BASELINE, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    lines, regressions = compare(results, baseline)
+    print('\n'.join(lines))
+    if args.save:
+        with io.open(BASELINE, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'python': platform.python_version(),
+                                'platform': platform.platform(),
+                                'records': args.records,
+                                'results': results}, indent=2, sort_keys=True) + '\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
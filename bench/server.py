@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Per-request cost of the resolver service against the Django view glue the
+README used to describe (from_openurl on the query string, then
+json.dumps, on every request).  Run from the repository root:
+
+    python -m bench.server
+    python -m bench.server --records 2000 --distinct 200
+
+Django isn't a dependency, so the glue is timed without Django's own
+request handling; its numbers are a lower bound.  The service is timed
+both in process (what a worker does per request) and end to end over a
+keep-alive HTTP connection to a local server.  --distinct sets how many
+different OpenURLs the requests cycle through, as repeats are what the
+service's cache is for.  Timings are microseconds per request.
+"""
+
+import argparse, itertools, json, sys, threading, time
+
+try:
+    from httplib import HTTPConnection
+    from urllib import quote
+except ImportError:
+    from http.client import HTTPConnection
+    from urllib.parse import quote
+
+from bench import corpus
+from bibjsontools.openurl import from_openurl
+from bibjsontools.server import ResolverServer, render
+
+
+def per_request(func, requests):
+    start = time.time()
+    for query in requests:
+        func(query)
+    return (time.time() - start) / len(requests) * 1000000
+
+def glue(query):
+    return json.dumps(from_openurl(query))
+
+def run(records=2000, distinct=200, seed=0):
+    """
+    name => microseconds per request.
+    """
+    #Escaped the way they'd arrive in a request line.
+    queries = [quote(q.encode('utf-8'), safe=b"=&%+:/;,?'()*!@$-_.~")
+               for q in itertools.islice(corpus.synthetic(distinct, seed, corpus.load()), distinct)]
+    requests = [queries[i % len(queries)] for i in range(records)]
+    server = ResolverServer(('127.0.0.1', 0), workers=2)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.daemon = True
+    thread.start()
+    results = {}
+    try:
+        results['django glue (no django)'] = per_request(glue, requests)
+        results['service, in process'] = per_request(
+            lambda query: render(server.cache.from_openurl(query), 'bibjson'), requests)
+        server.cache.clear()
+        conn = HTTPConnection('127.0.0.1', server.server_address[1])
+        def fetch(query):
+            conn.request('GET', '/bibjson?' + query)
+            conn.getresponse().read()
+        results['service, over http'] = per_request(fetch, requests)
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='resolver service vs. Django glue, per request')
+    parser.add_argument('--records', type=int, default=2000, help='requests to time')
+    parser.add_argument('--distinct', type=int, default=200, help='different OpenURLs among them')
+    args = parser.parse_args(argv)
+    for name, us in sorted(run(args.records, args.distinct).items()):
+        print('%-26s %9.2f us' % (name, us))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,4 +2,53 @@
 
 from __future__ import unicode_literals
 
-from openurl import *
+"""
+Converting OpenURLs to BibJSON and RIS.
+
+Importing the package is cheap and has no side effects.  The openurl
+names available here (from_openurl, to_openurl, OpenURLParser, ...) and
+the submodules (bibjsontools.ris, bibjsontools.cache, ...) are imported
+the first time they're used.
+"""
+
+import importlib, sys, types
+
+SUBMODULES = frozenset(['accesslog', 'authors', 'cache', 'cli', 'columns', 'fingerprint',
+                        'identifiers', 'index', 'instruments', 'jsonl', 'kev', 'openurl',
+                        'record', 'ris', 'server'])
+
+
+class LazyPackage(types.ModuleType):
+    """
+    Stands in for this package in sys.modules.  Python 2 modules can't
+    define __getattr__, so missing attributes are looked up here instead:
+    submodules are imported, anything else comes from openurl.
+    """
+
+    def __getattr__(self, name):
+        if name == '__all__':
+            openurl = self._import('openurl')
+            return [k for k in vars(openurl) if not k.startswith('_')]
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name in SUBMODULES:
+            value = self._import(name)
+        else:
+            value = getattr(self._import('openurl'), name)
+        setattr(self, name, value)
+        return value
+
+    def _import(self, name):
+        return importlib.import_module('%s.%s' % (self.__name__, name))
+
+    def __dir__(self):
+        return sorted(set(vars(self)) | SUBMODULES | set(self.__all__))
+
+    # end class LazyPackage()
+
+
+_package = LazyPackage(str(__name__), __doc__)
+_package.__dict__.update(vars(sys.modules[__name__]))
+#Keep the original module alive; Python 2 clears a module's globals when it's freed.
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Reading OpenURLs out of web server access logs.
+
+    >>> reader = AccessLogReader(rotated('/var/log/nginx/access.log'), path_prefix='/openurl')
+    >>> for bib in reader:
+    ...     bib['_log']['timestamp'], bib['_log']['client'], bib['title']
+    >>> reader.stats()
+
+Apache and Nginx common and combined formats are understood; logs ending
+in .gz are read gzipped.  Lines are streamed one at a time and the request
+target is checked with plain byte operations, before decoding or any regex,
+so the bulk of a log (images, css, health checks) costs next to nothing.  Each bibjson
+record gets a _log dict with the timestamp, client, status and so on.
+"""
+
+import gzip, io, logging, os, re
+
+from bibjsontools.openurl import from_openurl
+
+log = logging.getLogger( 'bibjsontools' )
+
+#Common/combined log format; referer and user agent are optional.
+LOG_LINE = re.compile(
+    r'^(?P<client>\S+) \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<path>[^ "]+)[^"]*" (?P<status>\d{3}) \S+'
+    r'(?: "(?P<referer>[^"]*)" "(?P<agent>[^"]*)")?')
+
+#Byte strings, at least one of which an OpenURL query has.  Only the query
+#of the request target is searched, not the referer or user agent.
+OPENURL_MARKERS = (b'rft', b'genre=', b'sid=', b'title=', b'issn=', b'isbn=', b'doi=', b'pmid=')
+
+MONTHS = dict((m, i + 1) for i, m in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']))
+
+
+def iso_time(log_time):
+    """
+    10/Oct/2000:13:55:36 -0700 => 2000-10-10T13:55:36-07:00
+    """
+    stamp, sep, zone = log_time.partition(' ')
+    day, month, rest = stamp.split('/', 2)
+    year, clock = rest.split(':', 1)
+    out = '%s-%02d-%sT%s' % (year, MONTHS[month], day, clock)
+    if zone:
+        out += '%s:%s' % (zone[:3], zone[3:])
+    return out
+
+def rotated(path):
+    """
+    A log and its rotations (access.log.1, access.log.2.gz, ...), oldest first.
+    """
+    directory, base = os.path.split(path)
+    numbered = []
+    for name in os.listdir(directory or '.'):
+        if not name.startswith(base + '.'):
+            continue
+        suffix = name[len(base) + 1:]
+        if suffix.endswith('.gz'):
+            suffix = suffix[:-3]
+        if suffix.isdigit():
+            numbered.append((int(suffix), os.path.join(directory, name)))
+    paths = [name for n, name in sorted(numbered, reverse=True)]
+    if os.path.exists(path):
+        paths.append(path)
+    return paths
+
+def request_target(line):
+    """
+    The raw target of a log line's request, '/openurl?sid=x' from
+    '... "GET /openurl?sid=x HTTP/1.1" ...', or None.
+    """
+    start = line.find(b'"')
+    if start < 0:
+        return
+    end = line.find(b'"', start + 1)
+    if end < 0:
+        return
+    request = line[start + 1:end].split(b' ')
+    if len(request) < 2:
+        return
+    return request[1]
+
+def open_log(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return io.open(path, 'rb')
+
+
+class AccessLogReader(object):
+    """
+    Iterates bibjson for the OpenURL requests in access logs.
+    parse turns a query string into bibjson; pass an OpenURLCache's
+    from_openurl to skip reparsing the repeats logs are full of.
+    """
+
+    def __init__(self, paths, path_prefix=None, parse=from_openurl):
+        self.paths = paths
+        self.path_prefix = path_prefix
+        self.prefix_bytes = path_prefix.encode('utf-8') if path_prefix else None
+        self.parse = parse
+        self.lines = 0
+        self.skipped = 0
+        self.records = 0
+        self.errors = 0
+
+    def wanted(self, line):
+        """
+        Cheap test of a raw line - could this be an OpenURL request?
+        """
+        target = request_target(line)
+        if target is None:
+            return False
+        path, sep, query = target.partition(b'?')
+        if not query:
+            return False
+        if (self.prefix_bytes is not None) and not path.startswith(self.prefix_bytes):
+            return False
+        for marker in OPENURL_MARKERS:
+            if marker in query:
+                return True
+        return False
+
+    def __iter__(self):
+        for path in self.paths:
+            f = open_log(path)
+            try:
+                for line in f:
+                    self.lines += 1
+                    if not self.wanted(line):
+                        self.skipped += 1
+                        continue
+                    line = line.decode('utf-8', 'replace')
+                    try:
+                        bib = self.parse_line(line)
+                    except Exception:
+                        self.errors += 1
+                        log.warning('could not parse log line %r', line, exc_info=True)
+                        continue
+                    if bib is None:
+                        self.skipped += 1
+                    else:
+                        self.records += 1
+                        yield bib
+            finally:
+                f.close()
+
+    def parse_line(self, line):
+        """
+        bibjson for one decoded log line, or None if it isn't an OpenURL request.
+        """
+        match = LOG_LINE.match(line)
+        if not match:
+            return
+        path, sep, query = match.group('path').partition('?')
+        if not query:
+            return
+        if self.path_prefix and not path.startswith(self.path_prefix):
+            return
+        bib = self.parse(query)
+        meta = {'timestamp': iso_time(match.group('time')),
+                'client': match.group('client'),
+                'method': match.group('method'),
+                'path': path,
+                'status': int(match.group('status'))}
+        user = match.group('user')
+        if user != '-':
+            meta['user'] = user
+        for k in ('referer', 'agent'):
+            v = match.group(k)
+            if v and v != '-':
+                meta[k] = v
+        bib['_log'] = meta
+        return bib
+
+    def stats(self):
+        return {'lines': self.lines,
+                'skipped': self.skipped,
+                'records': self.records,
+                'errors': self.errors}
+
+    # end class AccessLogReader()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Putting authors together from the au, aulast, aufirst and auinitm values
+of an OpenURL.  Linear in the number of authors.
+"""
+
+import re
+
+NOT_NAME = re.compile(r'\W+', re.UNICODE)
+
+
+def name_key(name):
+    """
+    Normalized form of a name for dedup - case, spacing and punctuation
+    don't matter.
+    """
+    return NOT_NAME.sub(' ', name).strip().lower()
+
+def split_name(name):
+    """
+    (last, first) names of a full name - split at the comma, or the last
+    name is the last word.
+    """
+    if ',' in name:
+        last, first = name.split(',', 1)
+        return last, first
+    parts = name.split()
+    if parts:
+        return parts[-1], ' '.join(parts[:-1])
+    return '', ''
+
+def _same_person(au, first):
+    """
+    Could a structured author be the full name with this first name?
+    The full name may carry more, e.g. a middle name.
+    """
+    if not au.get('firstname'):
+        return True
+    return name_key(first).startswith(name_key(au['firstname']))
+
+def build_authors(names, lasts, firsts=(), initms=()):
+    """
+    Build bibjson authors from full names (au) and the structured parts.
+    The nth aulast goes with the nth aufirst and auinitm.  A full name with
+    the same last name as a structured author, and a first name starting
+    with its aufirst, is the same person; the rest are separate authors.
+    Full names come first, in order.
+    """
+    structured = []
+    by_last = {}
+    for i, last in enumerate(lasts):
+        if not last:
+            continue
+        au = {'lastname': last}
+        if (i < len(firsts)) and firsts[i]:
+            au['firstname'] = firsts[i]
+        if (i < len(initms)) and initms[i]:
+            au['_minitial'] = initms[i]
+        structured.append(au)
+        by_last.setdefault(name_key(last), []).append(au)
+    out = []
+    seen = set()
+    for name in names:
+        key = name_key(name)
+        #Don't duplicate authors
+        if (not key) or (key in seen):
+            continue
+        seen.add(key)
+        last, first = split_name(name)
+        matches = by_last.get(name_key(last), [])
+        au = None
+        for i, candidate in enumerate(matches):
+            if _same_person(candidate, first):
+                au = matches.pop(i)
+                au['name'] = name
+                break
+        if au is None:
+            au = {'name': name}
+        out.append(au)
+    for au in structured:
+        if 'name' in au:
+            continue
+        #Put the full name (minus middlename) together.
+        name = '%s, %s' % (au['lastname'], au.get('firstname', '').strip())
+        au['name'] = name.rstrip(', ')
+        key = name_key(au['name'])
+        if key not in seen:
+            seen.add(key)
+            out.append(au)
+    return out
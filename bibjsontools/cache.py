@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Opt-in LRU cache in front of from_openurl and from_dict.
+Link resolvers see the same OpenURLs over and over; repeat queries are
+answered without parsing or re-encoding the _openurl.
+
+    >>> cache = OpenURLCache(maxsize=10000)
+    >>> bib = cache.from_openurl(query)
+    >>> cache.stats()['misses']
+    1
+"""
+
+import threading
+from collections import OrderedDict
+
+from bibjsontools.openurl import from_dict, from_openurl
+
+
+def query_key(query):
+    """
+    Normalize a query string so differently ordered, otherwise identical
+    queries share a cache entry. Repeated keys keep their relative order and
+    blank values are dropped, as they are by parse_qs.
+    """
+    if type(query) == str:
+        query = query.decode('utf-8')
+    pairs = [p for p in query.replace(';', '&').split('&') if p and not p.endswith('=')]
+    pairs.sort(key=lambda p: p.split('=', 1)[0])
+    return '&'.join(pairs)
+
+def dict_key(request_dict):
+    """
+    Normalize a query dict to a hashable key.
+    """
+    out = []
+    for k, v in request_dict.items():
+        if isinstance(v, list):
+            v = tuple(v)
+        out.append((k, v))
+    out.sort(key=lambda kv: kv[0])
+    return tuple(out)
+
+def copy_bib(value):
+    """
+    Copy the dicts and lists of a bibjson object so cached entries can't be
+    changed by callers.
+    """
+    if isinstance(value, dict):
+        return dict((k, copy_bib(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [copy_bib(v) for v in value]
+    return value
+
+
+class OpenURLCache(object):
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key, parse, arg):
+        """
+        Return a copy of the cached bibjson for key, parsing on a miss.
+        """
+        with self._lock:
+            bib = self._entries.pop(key, None)
+            if bib is not None:
+                #Re-insert to mark as most recently used.
+                self._entries[key] = bib
+                self.hits += 1
+                return copy_bib(bib)
+            self.misses += 1
+        bib = parse(arg)
+        with self._lock:
+            self._entries[key] = copy_bib(bib)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return bib
+
+    def from_openurl(self, query):
+        """
+        Cached from_openurl.
+        """
+        return self._get(('q', query_key(query)), from_openurl, query)
+
+    def from_dict(self, request_dict):
+        """
+        Cached from_dict.
+        """
+        return self._get(('d', dict_key(request_dict)), from_dict, request_dict)
+
+    def clear(self):
+        """
+        Drop all entries and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Hit, miss and eviction counters plus the current size.
+        """
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'size': len(self._entries),
+                    'maxsize': self.maxsize}
+
+    # end class OpenURLCache()
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Bulk conversion from the command line.
+
+    $ bibjsontools resolver-queries.txt.gz -f ris -o citations.ris --workers 4
+
+Input lines are OpenURL query strings, full OpenURLs, or JSONL where each
+line is a JSON string or an object with a "query" or "url" member; an
+object with neither is counted as an error.  RIS is written as
+ris.write_ris() writes it.  Files ending in .gz are read and written
+gzipped; with no files, stdin is read.  A summary with records/sec,
+errors and p50/p99 per-record latency goes to stderr at the end.
+
+With more than one worker, plain (not gzipped) input files are split into
+newline-aligned byte ranges and each worker memory-maps the file and
+converts its own ranges, so the input is never read by the parent or
+passed to the workers.  Range outputs go to temporary files that are
+copied to the output in order.
+"""
+
+import argparse, gzip, io, json, mmap, os, re, shutil, sys, tempfile, time
+from array import array
+
+from bibjsontools import jsonl, ris
+from bibjsontools.openurl import from_openurl, map_chunks
+
+FORMATS = ('json', 'ris', 'openurl')
+
+#Size of the byte ranges workers convert from plain input files.
+CHUNK_BYTES = 16 * 1024 * 1024
+
+#The scheme of a full URL, e.g. http://
+URL_SCHEME = re.compile(r'^[A-Za-z][A-Za-z0-9+.\-]*://')
+
+
+def query_from_line(line):
+    """
+    Pull the OpenURL query out of one input line.
+    """
+    line = line.strip()
+    if line[:1] in ('{', '"'):
+        value = json.loads(line)
+        if isinstance(value, dict):
+            value = value.get('query') or value.get('url')
+            if not value:
+                raise ValueError('JSON object has no "query" or "url"')
+        line = value
+    #Strip the URL in front of the query, but not a '?' in a query value.
+    base, sep, query = line.partition('?')
+    if sep and (URL_SCHEME.match(base) or ('=' not in base)):
+        line = query
+    return line
+
+def serialize(bib, fmt):
+    """
+    One record as output text, including its line/record terminator.
+    """
+    if fmt == 'ris':
+        return ris.convert_record(bib)
+    elif fmt == 'openurl':
+        return bib['_openurl'] + '\n'
+    return jsonl.dumps(bib) + '\n'
+
+def convert_line(fmt, line):
+    """
+    Returns (output, error, seconds) for one input line, bytes or decoded.
+    """
+    start = time.time()
+    try:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        text = serialize(from_openurl(query_from_line(line)), fmt)
+        return text, None, time.time() - start
+    except Exception as e:
+        return None, '%s: %s' % (type(e).__name__, e), time.time() - start
+
+def convert_chunk(chunk):
+    """
+    Worker side of run() - chunk is a list of (format, line) tuples.
+    Returns (output, error, seconds) for each line.
+    """
+    return [convert_line(fmt, line) for fmt, line in chunk]
+
+def byte_ranges(path, chunk_bytes):
+    """
+    Split a file into (start, end) byte ranges of about chunk_bytes, each
+    ending just after a newline or at the end of the file.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with io.open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def convert_range(task):
+    """
+    Worker side of run() for byte ranges - task is (path, start, end,
+    format, temporary directory).  Converts the non-blank lines of the
+    range, writing the output to a temporary file.
+    Returns (temporary file path, [(error, seconds) for each line]).
+    """
+    path, start, end, fmt, tmpdir = task
+    results = []
+    fd, out_path = tempfile.mkstemp(dir=tmpdir)
+    with io.open(fd, 'wb', buffering=1024 * 1024) as out:
+        with io.open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                pos = start
+                while pos < end:
+                    newline = mapped.find(b'\n', pos, end)
+                    if newline == -1:
+                        newline = end
+                    line = mapped[pos:newline].strip()
+                    pos = newline + 1
+                    if not line:
+                        continue
+                    text, error, seconds = convert_line(fmt, line)
+                    if text is not None:
+                        out.write(text.encode('utf-8'))
+                    results.append((error, seconds))
+            finally:
+                mapped.close()
+    return out_path, results
+
+def convert_ranges(tasks):
+    return [convert_range(task) for task in tasks]
+
+def mappable(path):
+    """
+    Can path be split into byte ranges - a plain, non-empty file?
+    """
+    return (path != '-') and (not path.endswith('.gz')) and os.path.isfile(path) and (os.path.getsize(path) > 0)
+
+def range_results(paths, output, fmt, workers, chunk_bytes):
+    """
+    Convert files a byte range per task, copying each range's output to the
+    output file in order.  Yields (None, error, seconds) for each line, like
+    convert_chunk() without the text.
+    """
+    tmpdir = tempfile.mkdtemp(prefix='bibjsontools-')
+    try:
+        tasks = ((path, start, end, fmt, tmpdir) for path in paths for start, end in byte_ranges(path, chunk_bytes))
+        for out_path, results in map_chunks(convert_ranges, tasks, workers, chunksize=1):
+            with io.open(out_path, 'rb') as f:
+                shutil.copyfileobj(f, output, 1024 * 1024)
+            os.remove(out_path)
+            for error, seconds in results:
+                yield None, error, seconds
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+def open_input(path):
+    if path == '-':
+        return getattr(sys.stdin, 'buffer', sys.stdin)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return io.open(path, 'rb', buffering=1024 * 1024)
+
+def open_output(path):
+    if path == '-':
+        return getattr(sys.stdout, 'buffer', sys.stdout)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wb')
+    return io.open(path, 'wb', buffering=1024 * 1024)
+
+def read_lines(paths):
+    """
+    Yield the non-blank lines of each input, undecoded; convert_line()
+    decodes them, so a bad byte fails one record rather than the run.
+    """
+    for path in paths:
+        f = open_input(path)
+        try:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if path != '-':
+                f.close()
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+def run(paths, output, fmt='json', workers=1, chunksize=500, errors=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Convert every line of the inputs, writing to the output file object.
+    With workers other than 1 and only plain files as inputs, workers
+    convert byte ranges of about chunk_bytes straight from the files.
+    Returns a dict of summary stats.
+    """
+    errors = errors or sys.stderr
+    latencies = array(str('d'))
+    records = failed = 0
+    start = time.time()
+    if (workers != 1) and all(mappable(path) for path in paths):
+        results = range_results(paths, output, fmt, workers, chunk_bytes)
+    else:
+        tasks = ((fmt, line) for line in read_lines(paths))
+        results = map_chunks(convert_chunk, tasks, workers, chunksize)
+    for text, error, seconds in results:
+        records += 1
+        latencies.append(seconds)
+        if error:
+            failed += 1
+            errors.write('record %d: %s\n' % (records, error))
+        elif text is not None:
+            output.write(text.encode('utf-8'))
+    elapsed = time.time() - start
+    ordered = sorted(latencies)
+    return {'records': records,
+            'errors': failed,
+            'seconds': elapsed,
+            'records_per_sec': records / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(ordered, 50) * 1000,
+            'p99_ms': percentile(ordered, 99) * 1000}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bibjsontools',
+                                     description='Convert OpenURLs to BibJSON, RIS or normalized OpenURLs.')
+    parser.add_argument('inputs', nargs='*', default=['-'],
+                        help='files of OpenURLs, .gz ok; default stdin')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='json')
+    parser.add_argument('-o', '--output', default='-', help='output file, .gz ok; default stdout')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='worker processes; 0 for one per cpu')
+    parser.add_argument('--chunksize', type=int, default=500,
+                        help='lines per task for stdin and gzipped inputs')
+    parser.add_argument('--chunk-bytes', type=int, default=CHUNK_BYTES,
+                        help='bytes per task for plain input files')
+    args = parser.parse_args(argv)
+    output = open_output(args.output)
+    try:
+        stats = run(args.inputs, output, args.format, args.workers or None, args.chunksize,
+                    chunk_bytes=args.chunk_bytes)
+    finally:
+        if args.output == '-':
+            output.flush()
+        else:
+            output.close()
+    sys.stderr.write('records: %(records)d  errors: %(errors)d  seconds: %(seconds).2f  '
+                     'records/sec: %(records_per_sec).1f  p50: %(p50_ms).3fms  p99: %(p99_ms).3fms\n' % stats)
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Columnar batch output, for analytics over parsed citations.
+Fields are read straight off OpenURLParser into column buffers, without
+building a bibjson dict per record: type, _rfr, journal name and ISSN are
+dictionary encoded (an int32 code per row plus a table of distinct
+values), year is an int32 array.
+
+    >>> with ColumnWriter(io.open('citations.bjc', 'wb')) as writer:
+    ...     for query in queries:
+    ...         writer.add_openurl(query)
+    >>> for group in read_columns('citations.bjc'):
+    ...     codes, journals = group['journal']
+
+pyarrow isn't a dependency, so the file format is a small one of our own
+in the same spirit as Parquet/Arrow IPC: a magic string, then row groups,
+each a length-prefixed JSON header (row count, byte order, each column's
+array typecode and item size, column dictionaries) followed by the raw
+column arrays.  read_columns() checks the typecode, item size and byte
+order, so files move between platforms.
+"""
+
+import io, json, struct, sys
+from array import array
+
+from bibjsontools.identifiers import normalize
+from bibjsontools.openurl import OpenURLParser
+
+MAGIC = b'BJCOL\x01'
+HEADER_LENGTH = struct.Struct(str('<I'))
+
+#Column name => how it's stored.
+COLUMNS = (
+    ('type', 'dictionary'),
+    ('_rfr', 'dictionary'),
+    ('journal', 'dictionary'),
+    ('issn', 'dictionary'),
+    ('year', 'int32'),
+    )
+
+#Code for a missing value in dictionary columns; missing years are 0.
+MISSING = -1
+
+#Signed integer array typecodes, smallest first.
+INT_TYPECODES = ('b', 'h', 'i', 'l')
+
+
+def int_typecode(itemsize):
+    """
+    The signed integer array typecode with itemsize bytes on this platform.
+    """
+    for typecode in INT_TYPECODES:
+        if array(str(typecode)).itemsize == itemsize:
+            return typecode
+    raise ValueError('no %d byte integer array type on this platform' % itemsize)
+
+#Typecode of the int32 arrays columns are stored in.
+INT32 = int_typecode(4)
+
+
+def _year(parser):
+    year = (parser._field('date') or '')[:4]
+    if year.isdigit():
+        return int(year)
+    return 0
+
+def _issn(parser):
+    """
+    The lowest normalized ISSN, so the choice doesn't depend on key order.
+    """
+    issns = []
+    for value in parser._field_repeating('issn'):
+        issns.extend(normalize('issn', isn) for isn in value.split())
+    if issns:
+        return min(issns)
+
+def _journal(parser):
+    return parser._shared('titles').get('journal', {}).get('name')
+
+#Column name => function of an OpenURLParser.  The values are the ones
+#parse() would give.
+EXTRACTORS = {
+    'type': lambda parser: parser.type,
+    '_rfr': lambda parser: parser.rfr(),
+    'journal': _journal,
+    'issn': _issn,
+    'year': _year,
+    }
+
+
+class DictionaryColumn(object):
+    """
+    Strings as int32 codes into a table of distinct values.
+    """
+
+    def __init__(self):
+        self.codes = array(str(INT32))
+        self.values = []
+        self.lookup = {}
+
+    def append(self, value):
+        if not value:
+            self.codes.append(MISSING)
+            return
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def clear(self):
+        self.__init__()
+
+    # end class DictionaryColumn()
+
+
+class ColumnWriter(object):
+    """
+    Buffers columns and writes a row group every rows_per_group records.
+    fileobj is a binary file object.
+    """
+
+    def __init__(self, fileobj, rows_per_group=65536):
+        self.fileobj = fileobj
+        self.rows_per_group = rows_per_group
+        self.rows = 0
+        self.columns = []
+        for name, kind in COLUMNS:
+            column = DictionaryColumn() if kind == 'dictionary' else array(str(INT32))
+            self.columns.append((name, kind, EXTRACTORS[name], column))
+        self.fileobj.write(MAGIC)
+
+    def add(self, parser):
+        """
+        Add one record, from an OpenURLParser.
+        """
+        for name, kind, extract, column in self.columns:
+            column.append(extract(parser))
+        self.rows += 1
+        if self.rows >= self.rows_per_group:
+            self.flush()
+
+    def add_openurl(self, query):
+        self.add(OpenURLParser(query))
+
+    def flush(self):
+        """
+        Write the buffered rows as a row group.
+        """
+        if not self.rows:
+            return
+        header = {'rows': self.rows, 'byteorder': sys.byteorder, 'columns': []}
+        buffers = []
+        for name, kind, extract, column in self.columns:
+            codes = column.codes if kind == 'dictionary' else column
+            meta = {'name': name, 'kind': kind, 'typecode': codes.typecode, 'itemsize': codes.itemsize}
+            buffers.append(codes.tostring())
+            if kind == 'dictionary':
+                meta['dictionary'] = column.values
+                column.clear()
+            else:
+                del column[:]
+            header['columns'].append(meta)
+        header = json.dumps(header).encode('utf-8')
+        self.fileobj.write(HEADER_LENGTH.pack(len(header)))
+        self.fileobj.write(header)
+        for buf in buffers:
+            self.fileobj.write(buf)
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # end class ColumnWriter()
+
+
+def write_columns(queries, path, rows_per_group=65536):
+    """
+    Parse OpenURL queries into a columnar file.  Returns the record count.
+    """
+    count = 0
+    with ColumnWriter(io.open(path, 'wb'), rows_per_group) as writer:
+        for query in queries:
+            writer.add_openurl(query)
+            count += 1
+    return count
+
+def read_columns(path):
+    """
+    Yield each row group as a dict of column name => (codes, dictionary)
+    for dictionary columns or an int32 array for the others, plus 'rows'.
+    """
+    with io.open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('%s is not a bibjsontools column file' % path)
+        while True:
+            length = f.read(HEADER_LENGTH.size)
+            if not length:
+                return
+            header = json.loads(f.read(HEADER_LENGTH.unpack(length)[0]).decode('utf-8'))
+            if header.get('byteorder') not in ('little', 'big'):
+                raise ValueError('%s: unknown byte order %r' % (path, header.get('byteorder')))
+            group = {'rows': header['rows']}
+            for meta in header['columns']:
+                if meta.get('typecode') not in INT_TYPECODES:
+                    raise ValueError('%s: column %s has unknown typecode %r' % (path, meta['name'], meta.get('typecode')))
+                #The writer's typecode may have another size here; match the size.
+                column = array(str(int_typecode(meta['itemsize'])))
+                size = header['rows'] * column.itemsize
+                data = f.read(size)
+                if len(data) != size:
+                    raise ValueError('%s: column %s is truncated' % (path, meta['name']))
+                column.fromstring(data)
+                if header['byteorder'] != sys.byteorder:
+                    column.byteswap()
+                if meta['kind'] == 'dictionary':
+                    group[meta['name']] = (column, meta['dictionary'])
+                else:
+                    group[meta['name']] = column
+            yield group
+
+def decode(column):
+    """
+    The values of a (codes, dictionary) column, with None for missing.
+    """
+    codes, dictionary = column
+    return [dictionary[c] if c != MISSING else None for c in codes]
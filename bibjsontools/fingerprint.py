@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Stable fingerprints for citations, for dedup and cache keys.
+The same article arriving as differently ordered or aliased OpenURLs
+(rft.atitle vs atitle, doi= vs rft_id=info:doi/) gets the same fingerprint.
+"""
+
+import hashlib, re
+
+from bibjsontools.identifiers import canonical
+from bibjsontools.openurl import OpenURLParser
+
+#Identifiers specific enough to stand for the citation, in order of preference.
+#ISSNs only identify the journal.
+STRONG_IDS = ('doi', 'pmid', 'isbn', 'oclc')
+
+#Identifiers of the whole book, which a chapter, article or paper shares
+#with everything else published in the same book.
+BOOK_IDS = ('isbn', 'oclc')
+
+NOT_WORD = re.compile(r'\W+', re.UNICODE)
+
+
+def fingerprint_key(identifiers, title=None, year=None, volume=None, start_page=None, btype=None):
+    """
+    The normalized string that is hashed: the strongest identifier, or the
+    title, year, volume and start page when there isn't one.  Anything but
+    a book only uses a book-level ISBN or OCLC number together with its
+    title and start page.
+    """
+    #The lowest id of each type, so the choice doesn't depend on input order.
+    ids = {}
+    for idt_type, idt in canonical(identifiers):
+        if (idt_type not in ids) or (idt < ids[idt_type]):
+            ids[idt_type] = idt
+    if (start_page == '?') or (start_page is None):
+        start_page = ''
+    title = NOT_WORD.sub(' ', title or '').strip().lower()
+    for idt_type in STRONG_IDS:
+        if idt_type in ids:
+            if (btype != 'book') and (idt_type in BOOK_IDS):
+                return '%s:%s|%s|%s' % (idt_type, ids[idt_type], title, start_page)
+            return '%s:%s' % (idt_type, ids[idt_type])
+    return 'cite:%s|%s|%s|%s' % (title, (year or '')[:4], volume or '', start_page)
+
+def _hash(key):
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def fingerprint(bib):
+    """
+    Fingerprint a bibjson object (dict or BibRecord).
+    """
+    title = bib.get('title')
+    if title == 'Unknown':
+        title = None
+    return _hash(fingerprint_key(bib.get('identifier', []), title, bib.get('year'),
+                                 bib.get('volume'), bib.get('start_page'), bib.get('type')))
+
+def fingerprint_openurl(query):
+    """
+    Fingerprint an OpenURL query without the full parse() and _openurl
+    round trip; matches fingerprint(from_openurl(query)).
+    """
+    b = OpenURLParser(query)
+    return _hash(fingerprint_key(b._shared('identifiers'), b._field('title'), b._field('date'),
+                                 b._field('volume'), b._field('spage'), b.type))
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Classifying and normalizing the identifiers found in OpenURLs.
+Patterns are compiled once at import.
+"""
+
+import re
+
+#Keys whose values carry a prefix saying what kind of id they are.
+ID_KEYS = frozenset(['rft.id', 'rft_id', 'id'])
+
+#Prefixes on rft_id style values.
+ID_PREFIX = re.compile(r'(?P<doi>info:doi/|doi:)|(?P<pmid>info:pmid/|pmid[:/]?)')
+
+#Prefixes stripped when normalizing.
+DOI_PREFIX = re.compile(r'^(?:info:doi/|doi:|https?://(?:dx\.)?doi\.org/)', re.IGNORECASE)
+PMID_PREFIX = re.compile(r'^(?:info:pmid/|pmid[:/]?)', re.IGNORECASE)
+OCLC_PREFIX = re.compile(r'^(?:\(ocolc\)|ocm|ocn|on)', re.IGNORECASE)
+NOT_ISN = re.compile(r'[^0-9X]')
+NUMBER = re.compile(r'\d+')
+#Nine digits and a check character; anything else isn't converted to ISBN-13.
+ISBN10 = re.compile(r'^[0-9]{9}[0-9X]\Z')
+
+
+def classify(key, value):
+    """
+    Type a single incoming identifier value by its key and prefix.
+    Yields {'type', 'id'} dicts; ISBNs and ISSNs are repeated on occasion
+    so a value can hold more than one.
+    """
+    #Remove line breaks from values.
+    value = value.replace('\n', '')
+    if not value:
+        return
+    if key in ID_KEYS:
+        #DOIS and PMIDS in the id
+        match = ID_PREFIX.match(value)
+        if match:
+            rest = value[match.end():]
+            #Check for blank ids
+            if not rest:
+                return
+            if match.lastgroup == 'doi':
+                yield {'type': 'doi', 'id': 'doi:%s' % rest}
+            else:
+                #Handle pubmed IDs coming in like this pmid:18539564
+                yield {'type': 'pmid', 'id': 'info:pmid/%s' % rest}
+    #Other ids from the wild
+    elif key == 'pmid':
+        yield {'type': 'pmid', 'id': value}
+    elif key == 'doi':
+        yield {'type': 'doi', 'id': 'doi:%s' % value}
+    elif key in ('rft.isbn', 'isbn', 'rft.issn', 'issn'):
+        isn_type = key.replace('rft.', '')
+        for isn in value.split():
+            yield {'type': isn_type, 'id': isn}
+    elif key in ('rft.eissn', 'eissn'):
+        yield {'type': 'eissn', 'id': value}
+
+
+def pull_oclc(odict):
+    """
+    Pull OCLC numbers from incoming FirstSearch/Worldcat urls.
+    """
+    rfe_dat = _first(odict, 'rfe_dat')
+    pid = _first(odict, 'pid')
+    #In order of preference.
+    spots = []
+    if 'firstsearch' in _first(odict, 'rfr_id'):
+        spots.append(rfe_dat)
+    if 'accession' in pid:
+        spots.append(pid)
+    #rfe_dat - these are probably OCLC numbers in most cases.
+    if 'accessionnumber' in rfe_dat:
+        spots.append(rfe_dat)
+    for spot in spots:
+        match = NUMBER.search(spot)
+        if match:
+            return match.group()
+    return
+
+def _first(odict, key):
+    v = odict.get(key)
+    if v:
+        return v[0]
+    return ''
+
+
+def normalize(idt_type, value):
+    """
+    Canonical form of an identifier, for dedup and index keys.
+    DOIs lose their prefix and are lowercased, PMIDs and OCLC numbers are
+    bare numbers, ISBNs are ISBN-13 without hyphens and ISSNs are the
+    eight characters without the hyphen.
+    """
+    value = value.strip()
+    if idt_type == 'doi':
+        return DOI_PREFIX.sub('', value).lower()
+    elif idt_type == 'pmid':
+        return PMID_PREFIX.sub('', value)
+    elif idt_type == 'isbn':
+        isbn = NOT_ISN.sub('', value.upper())
+        if ISBN10.match(isbn):
+            return isbn10_to_13(isbn)
+        return isbn
+    elif (idt_type == 'issn') or (idt_type == 'eissn'):
+        return NOT_ISN.sub('', value.upper())
+    elif idt_type == 'oclc':
+        return OCLC_PREFIX.sub('', value).lstrip('0')
+    return value
+
+def isbn10_to_13(isbn):
+    """
+    Convert a ten character ISBN to the 978 prefixed ISBN-13.
+    """
+    digits = '978' + isbn[:9]
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return '%s%d' % (digits, (10 - total % 10) % 10)
+
+def canonical(identifiers):
+    """
+    Normalized, de-duplicated (type, id) pairs for a bibjson identifier list.
+    """
+    out = []
+    seen = set()
+    for idt in identifiers:
+        key = (idt['type'], normalize(idt['type'], idt['id']))
+        if key[1] and (key not in seen):
+            seen.add(key)
+            out.append(key)
+    return out
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+A persistent, SQLite-backed index from identifiers to record ids.
+
+    >>> index = IdentifierIndex('identifiers.db')
+    >>> index.add_many(from_openurl(q) for q in queries)
+    >>> index.lookup('doi', 'doi:10.1039/B814549K')
+    ['3f0c...']
+    >>> index.lookup_prefix('0165')
+    [('issn', '01650203', '3f0c...')]
+
+Identifiers are stored normalized (see identifiers.normalize), so lookups
+match however the id was written.  Record ids default to the citation
+fingerprint; pass record_id, a function of the record, to use your own:
+
+    >>> index.add(bib, record_id=lambda bib: bib['id'])
+
+The table is a single clustered (type, id, record) key, so point and
+prefix queries are one b-tree range scan.
+"""
+
+import sqlite3
+
+from bibjsontools.fingerprint import fingerprint
+from bibjsontools.identifiers import canonical, normalize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS identifier (
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (type, id, record)
+) WITHOUT ROWID
+"""
+
+INSERT = 'INSERT OR IGNORE INTO identifier (type, id, record) VALUES (?, ?, ?)'
+
+
+def _rows(bib, record_id):
+    """
+    The record id and (type, normalized id, record id) rows for one record.
+    """
+    rid = record_id(bib)
+    if not rid:
+        raise ValueError('no record id for %r' % (bib,))
+    return rid, [(idt_type, idt, rid) for idt_type, idt in canonical(bib.get('identifier', []))]
+
+
+class IdentifierIndex(object):
+
+    def __init__(self, path, batch=10000):
+        self.batch = batch
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def add(self, bib, record_id=fingerprint):
+        """
+        Index one record.  record_id is a function of the record.
+        Returns the record id, even when the record has no identifiers.
+        """
+        rid, rows = _rows(bib, record_id)
+        self._insert(rows)
+        return rid
+
+    def add_many(self, records, record_id=fingerprint):
+        """
+        Index a stream of records, committing every `batch` records.
+        record_id is a function of the record, as for add().  Returns the
+        number of records read.
+        """
+        count = 0
+        rows = []
+        for bib in records:
+            count += 1
+            rows.extend(_rows(bib, record_id)[1])
+            if count % self.batch == 0:
+                self._insert(rows)
+                rows = []
+        self._insert(rows)
+        return count
+
+    def _insert(self, rows):
+        with self.conn:
+            self.conn.executemany(INSERT, rows)
+
+    def lookup(self, idt_type, value):
+        """
+        Record ids with the given identifier, as found in bibjson or an OpenURL.
+        """
+        cursor = self.conn.execute('SELECT record FROM identifier WHERE type = ? AND id = ?',
+                                   (idt_type, normalize(idt_type, value)))
+        return [row[0] for row in cursor]
+
+    def lookup_prefix(self, prefix, types=('issn', 'eissn')):
+        """
+        (type, id, record id) for every identifier of the given types starting
+        with prefix - by default ISSNs, e.g. '0165' or '0165-02'.
+        """
+        out = []
+        for idt_type in types:
+            start = normalize(idt_type, prefix)
+            cursor = self.conn.execute('SELECT type, id, record FROM identifier '
+                                       'WHERE type = ? AND id >= ? AND id < ? ORDER BY id',
+                                       (idt_type, start, start + '\uffff'))
+            out.extend(cursor)
+        return out
+
+    def identifiers(self, record_id):
+        """
+        The (type, id) pairs indexed for a record.  This is a table scan;
+        it's for inspection, not the hot path.
+        """
+        cursor = self.conn.execute('SELECT type, id FROM identifier WHERE record = ?', (record_id,))
+        return cursor.fetchall()
+
+    def __len__(self):
+        return self.conn.execute('SELECT count(*) FROM identifier').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # end class IdentifierIndex()
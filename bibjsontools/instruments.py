@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Opt-in per-stage timing and counters for OpenURLParser.
+
+    >>> with Instruments() as instruments:
+    ...     bib = from_openurl(query)
+    >>> instruments.stats()['stages']['identifiers']['calls']
+    1
+    >>> instruments.dump(io.open('parse-stats.json', 'w'))
+
+attach() and detach() do the same as the with block, for long-running
+processes; there's one set of instruments attached at a time.
+
+Stages are the memoized parser methods (type, rfr, identifiers, titles,
+authors, pages), pull_oclc, the to_openurl re-encode and parse as a
+whole.  Times are inclusive - titles() includes working out the type the
+first time, parse includes everything.  Each stage keeps a call count,
+cumulative seconds and a histogram of calls by power-of-two microseconds.
+keys counts the OpenURL keys that matched a field alias.
+
+Instruments are off unless attached; the disabled cost is a check for
+None on each stage's first call.
+"""
+
+import json, threading
+from collections import Counter
+
+from bibjsontools.openurl import set_instruments
+
+#Histogram buckets are upper bounds in microseconds: 1, 2, 4, ... 2**20 and
+#the last, open ended.
+BUCKETS = 22
+
+
+class Instruments(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = Counter()
+            self.seconds = Counter()
+            self.histograms = {}
+            self.keys = Counter()
+
+    def record(self, stage, seconds):
+        """
+        Count one call of a stage taking seconds.
+        """
+        bucket = min(int(seconds * 1000000).bit_length(), BUCKETS - 1)
+        with self.lock:
+            self.calls[stage] += 1
+            self.seconds[stage] += seconds
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = [0] * BUCKETS
+            histogram[bucket] += 1
+
+    def count_keys(self, keys):
+        """
+        Count the alias keys found in one query.
+        """
+        keys = list(keys)
+        with self.lock:
+            self.keys.update(keys)
+
+    def stats(self):
+        """
+        {'stages': {stage: {calls, seconds, mean_us, histogram}}, 'keys': {key: count}}
+        Histograms map each bucket's upper bound, e.g. '<16us', to its calls;
+        empty buckets are left out.
+        """
+        with self.lock:
+            stages = {}
+            for stage, calls in self.calls.items():
+                histogram = {}
+                for bucket, count in enumerate(self.histograms[stage]):
+                    if count:
+                        label = '<%dus' % (1 << bucket) if bucket < BUCKETS - 1 else '>=%dus' % (1 << (bucket - 1))
+                        histogram[label] = count
+                stages[stage] = {'calls': calls,
+                                 'seconds': self.seconds[stage],
+                                 'mean_us': self.seconds[stage] / calls * 1000000,
+                                 'histogram': histogram}
+            return {'stages': stages, 'keys': dict(self.keys)}
+
+    def dump(self, fileobj):
+        """
+        Write stats() as JSON to a text file object.
+        """
+        fileobj.write(json.dumps(self.stats(), indent=2, sort_keys=True) + '\n')
+
+    def attach(self):
+        """
+        Start recording parses.  Returns self.
+        """
+        set_instruments(self)
+        return self
+
+    def detach(self):
+        set_instruments(None)
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    # end class Instruments()
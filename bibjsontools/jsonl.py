@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Streaming bibjson records out as JSON lines.
+
+    >>> with JSONLWriter(io.open('citations.jsonl', 'wb')) as writer:
+    ...     for query in queries:
+    ...         writer.write(from_openurl(query))
+
+Records are encoded with ujson when it's installed, otherwise with a single
+preconfigured json encoder - the C accelerated one, with circular reference
+checks off since bibjson records are trees.  Lines are written to the file
+a batch at a time rather than one write (and one newline concatenation)
+per record.
+"""
+
+import json
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+BACKENDS = ('json', 'ujson')
+
+#Same output as json.dumps with the default arguments.
+ENCODER = json.JSONEncoder(check_circular=False)
+
+
+def encoder(backend=None):
+    """
+    A function encoding one record to a JSON string.  backend is 'json' or
+    'ujson'; by default, the fastest one installed.
+    """
+    if backend is None:
+        backend = 'ujson' if ujson is not None else 'json'
+    if backend == 'ujson':
+        if ujson is None:
+            raise ValueError('ujson is not installed')
+        return _ujson_dumps
+    elif backend == 'json':
+        return ENCODER.encode
+    raise ValueError('unknown json backend: %r' % backend)
+
+def _ujson_dumps(bib):
+    return ujson.dumps(bib, ensure_ascii=True, escape_forward_slashes=False)
+
+def _plain(bib):
+    """
+    BibRecords and LazyBibs as plain dicts.
+    """
+    if isinstance(bib, dict):
+        return bib
+    return bib.to_dict()
+
+#Encode a record with the default backend.
+_encode = encoder()
+
+def dumps(bib):
+    """
+    One record as a JSON string, with the default backend.
+    """
+    return _encode(_plain(bib))
+
+
+class JSONLWriter(object):
+    """
+    Writes records to a binary file object, one JSON document per line.
+    """
+
+    def __init__(self, fileobj, backend=None, batch=256):
+        self.fileobj = fileobj
+        self.encode = encoder(backend)
+        self.batch = batch
+        self.lines = []
+        self.count = 0
+
+    def write(self, bib):
+        self.lines.append(self.encode(_plain(bib)))
+        self.count += 1
+        if len(self.lines) >= self.batch:
+            self.flush()
+
+    def write_all(self, records):
+        """
+        Write every record of an iterable.  Returns the number written.
+        """
+        count = self.count
+        for bib in records:
+            self.write(bib)
+        return self.count - count
+
+    def flush(self):
+        if self.lines:
+            #The trailing '' ends the last line.
+            self.lines.append('')
+            self.fileobj.write('\n'.join(self.lines).encode('utf-8'))
+            self.lines = []
+
+    def close(self):
+        self.flush()
+        self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # end class JSONLWriter()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Tokenizing OpenURL KEV (key=value&key=value) query strings.
+Only the keys the parser reads are decoded; everything else (req_dat,
+session ids, etc.) is kept as undecoded slices.  Decoding matches parse_qs.
+"""
+
+try:
+    from urlparse import unquote
+except ImportError:
+    from urllib.parse import unquote
+
+
+def decode(s):
+    """
+    Undo the +/% escaping of a key or value.
+    """
+    if '+' in s:
+        s = s.replace('+', ' ')
+    if '%' in s:
+        s = unquote(s)
+    return s
+
+def tokenize(query, wanted):
+    """
+    Split a query into a dict of decoded value lists for the wanted keys and
+    a list of (key, undecoded value) pairs for everything else.
+    Blank values are dropped, as they are by parse_qs.
+    """
+    data = {}
+    rest = []
+    for pair in query.replace(';', '&').split('&'):
+        k, sep, v = pair.partition('=')
+        if not v:
+            continue
+        if ('%' in k) or ('+' in k):
+            k = decode(k)
+        if k in wanted:
+            v = decode(v)
+            values = data.get(k)
+            if values is None:
+                data[k] = [v]
+            else:
+                values.append(v)
+        else:
+            rest.append((k, v))
+    return data, rest
+
+def decode_rest(data, rest):
+    """
+    Merge the undecoded pairs back into a copy of data, giving what
+    parse_qs would have returned for the whole query.
+    """
+    out = dict((k, list(v)) for k, v in data.items())
+    for k, v in rest:
+        out.setdefault(k, []).append(decode(v))
+    return out
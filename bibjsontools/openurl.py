@@ -6,88 +6,245 @@ from __future__ import unicode_literals
 Converting OpenURLs to BibJSON and back.
 """
 
-import logging, pprint, urllib
+import collections, functools, itertools, logging, re, time
 
-try:
-    from urlparse import parse_qs
-except ImportError:
-    from cgi import parse_qs
+from bibjsontools.authors import build_authors
+from bibjsontools.identifiers import DOI_PREFIX, classify, pull_oclc
+from bibjsontools.kev import decode_rest, tokenize
+from bibjsontools.record import Author, BibRecord, Identifier, Journal
 
 #List of keys that should be present in any bibjson object.
 REQUIRED_KEYS = ['title']
 
-
-logging.basicConfig(
-    level=logging.WARNING,
-    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+#Canonical fields and the OpenURL keys that feed them, in order of preference.
+#A key can feed more than one field, e.g. rft.btitle is both a title and a
+#journal (container) title.
+FIELDS = (
+    ('genre', ('rft.genre', 'genre')),
+    ('format', ('rft_val_fmt',)),
+    ('atitle', ('rft.atitle', 'atitle')),
+    ('btitle', ('rft.btitle', 'btitle')),
+    #Short titles are last.
+    ('title', ('rft.atitle', 'atitle', 'rft.btitle', 'btitle', 'rft.title',
+               'title', 'stitle', 'rft.stitle')),
+    ('jtitle', ('rft.jtitle', 'jtitle', 'rft.btitle', 'btitle', 'rft.title',
+                'title')),
+    ('stitle', ('rft.stitle', 'stitle')),
+    ('id', ('rft.id', 'rft_id', 'id', 'doi', 'pmid', 'pid', 'rfe_dat')),
+    ('isbn', ('rft.isbn', 'isbn')),
+    ('issn', ('rft.issn', 'issn')),
+    ('eissn', ('rft.eissn', 'eissn')),
+    ('au', ('rft.au', 'au')),
+    ('aulast', ('rft.aulast', 'aulast')),
+    ('aufirst', ('rft.aufirst', 'aufirst')),
+    ('auinitm', ('rft.auinitm', 'auinitm')),
+    ('pages', ('rft.pages', 'pages')),
+    ('spage', ('rft.spage', 'spage')),
+    ('epage', ('rft.epage', 'epage')),
+    ('rfr', ('rfr_id', 'sid', 'id')),
+    ('publisher', ('rft.pub', 'pub', 'rft.publisher', 'publisher')),
+    ('place', ('rft.place', 'place')),
+    ('volume', ('rft.volume', 'volume')),
+    ('issue', ('rft.issue', 'issue')),
+    ('date', ('rft.date', 'date')),
+)
+
+#Reverse lookup - OpenURL key => [(field, rank), ...]
+ALIASES = {}
+for _field, _keys in FIELDS:
+    for _rank, _key in enumerate(_keys):
+        ALIASES.setdefault(_key, []).append((_field, _rank))
+del _field, _keys, _rank, _key
+
+#Keys decoded from incoming query strings.  pull_oclc's rfr_id, pid and
+#rfe_dat are all FIELDS keys too.
+WANTED_KEYS = frozenset(ALIASES)
+
+
+#Logging is configured by the application, not on import.
 log = logging.getLogger( 'bibjsontools' )
+log.addHandler( logging.NullHandler() )
+
+#Optional tracer, a callable(event, **fields). None (the default) disables
+#tracing; call sites check for it before building any event data.
+tracer = None
+
+def set_tracer(new_tracer):
+    """
+    Attach a tracer, or None to detach.  Events emitted:
+    parser.init (query, data), parser.parse (bib), from_openurl (query),
+    to_openurl.init (bib), to_openurl.parse (kevs, openurl).
+    """
+    global tracer
+    tracer = new_tracer
+
+#Optional per-stage timing and counters, e.g. an instruments.Instruments.
+#None (the default) disables them; like the tracer, call sites check first.
+instruments = None
+
+def set_instruments(new_instruments):
+    """
+    Attach instruments, or None to detach.  See bibjsontools.instruments.
+    """
+    global instruments
+    instruments = new_instruments
+
+def log_tracer(event, **fields):
+    """
+    Tracer that writes each event to the bibjsontools debug log.
+    """
+    import pprint
+    log.debug( '%s, ```%s```', event, pprint.pformat(fields) )
+
+
+#Name => undecorated method, for each memoized parser method.
+MEMOIZED = {}
+
+def memoized(method):
+    """
+    Cache a derived value on the parser until its data changes.
+    Callers get copies of cached lists and dicts, so changing a result
+    doesn't change the parser; OpenURLParser._shared() gives code in this
+    package the cached value itself.
+    """
+    name = method.__name__
+    MEMOIZED[name] = method
+    @functools.wraps(method)
+    def wrapper(self):
+        return _copy(self._shared(name))
+    return wrapper
+
+def _copy(value):
+    """
+    Copy a memoized value - a list of dicts, or a dict of values and dicts.
+    """
+    if isinstance(value, list):
+        return [dict(v) for v in value]
+    if isinstance(value, dict):
+        return dict((k, dict(v) if isinstance(v, dict) else v) for k, v in value.items())
+    return value
 
 
 class OpenURLParser(object):
 
     def __init__(self, openurl, query_dict=None):
+        #(key, undecoded value) pairs for the keys the parser doesn't read.
+        self.extra = []
         if query_dict:
-            log.debug( 'query_dict perceived' )
             self.data = query_dict
         else:
-            log.debug( 'openurl perceived' )
-            log.debug( 'type(openurl), `%s`' % type(openurl) )
             if type(openurl) == str:
                 openurl = openurl.decode( 'utf-8' )
-            log.debug( 'openurl, ```%s```' % openurl )
             self.query = openurl
-            self.data = parse_qs(openurl)
+            data, self.extra = tokenize(openurl, WANTED_KEYS)
+            self.data = data
+        if tracer is not None:
+            tracer('parser.init', query=openurl, data=self.data)
 
-    def _find_key(self, key_list, this_dict=None):
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self.invalidate()
+
+    def invalidate(self):
         """
-        Utility to get the first matching value from a list of possible keys.
+        Rebuild the field index and drop memoized values.
+        Call this after changing the data dict in place.
         """
-        #Default to the data dict.
-        if not this_dict:
-            this_dict = self.data
-        for k in key_list:
-            v = this_dict.get(k, None)
-            if v:
-                return v[0]
+        self.index = self._build_index(self._data)
+        self._memo = {}
+        inst = instruments
+        if inst is not None:
+            inst.count_keys(k for k in self._data if k in ALIASES)
+
+    def _shared(self, name):
+        """
+        The cached value of a memoized method, computing it the first time.
+        It's shared by every later call and parse(), so don't change it or
+        hand it out.
+        """
+        try:
+            return self._memo[name]
+        except KeyError:
+            #Read the global once, so a detach() in another thread part way
+            #through can't leave us calling record() on None.
+            inst = instruments
+            if inst is None:
+                value = self._memo[name] = MEMOIZED[name](self)
+            else:
+                start = time.time()
+                value = self._memo[name] = MEMOIZED[name](self)
+                inst.record(name, time.time() - start)
+            return value
+
+    def full_data(self):
+        """
+        The whole query decoded, as parse_qs would return it.
+        """
+        return decode_rest(self.data, self.extra)
+
+    def _build_index(self, data):
+        """
+        Fold the incoming keys into the canonical FIELDS in a single pass.
+        Each field holds (rank, key, values) entries, best match first.
+        """
+        index = {}
+        for k, v in data.items():
+            if not v:
+                continue
+            for field, rank in ALIASES.get(k, ()):
+                index.setdefault(field, []).append((rank, k, v))
+        for entries in index.values():
+            entries.sort()
+        return index
+
+    def _field(self, field):
+        """
+        Get the first value for a canonical field.
+        """
+        entries = self.index.get(field)
+        if entries:
+            return entries[0][2][0]
         return
 
-    def _find_repeating_key(self, key_list, this_dict=None):
+    def _field_values(self, field):
         """
-        Utility to get a unique list of values from a set of keys.
+        Return a list of key,values tuples for a canonical field.
         """
-        out = []
-        #Default to the data dict.
-        if not this_dict:
-            this_dict = self.data
-        for k in key_list:
-            v = this_dict.get(k, None)
-            if v:
-                out += v
-        return set(out)
+        return [(k, v) for rank, k, v in self.index.get(field, ())]
+
+    def _field_list(self, field):
+        """
+        Get all the values of the best matching key for a canonical field.
+        """
+        entries = self.index.get(field)
+        if entries:
+            return entries[0][2]
+        return []
 
-    def _find_key_values(self, key_list, this_dict=None):
+    def _field_repeating(self, field):
         """
-        Utility to return a list of key,value tuples from a list of possible keys.
+        Get a unique set of values for a canonical field.
         """
-        #Default to the data dict.
-        if not this_dict:
-            this_dict = self.data
         out = []
-        for k in key_list:
-            v = this_dict.get(k, None)
-            if v:
-                out.append((k, v))
-        return out
+        for rank, k, v in self.index.get(field, ()):
+            out += v
+        return set(out)
 
     @property
+    @memoized
     def type(self):
         """
         Determine the type of citation.  Defaults to book.
         """
         #Defaulting to type of book.
         btype = 'book'
-        genre = self._find_key(['rft.genre', 'genre'])
-        format = self._find_key(['rft_val_fmt'])
+        genre = self._field('genre')
+        format = self._field('format')
 
         if format:
             if 'journal' in format:
@@ -108,174 +265,82 @@ class OpenURLParser(object):
                 elif 'dissertation' in genre:
                     return 'dissertation'
         #Try to guess based on incoming values.
-        elif self._find_key(['rft.atitle', 'atitle']):
+        elif self._field('atitle'):
             btype = 'article'
-        elif self._find_key(['rft.btitle', 'btitle']):
+        elif self._field('btitle'):
             btype = 'book'
         return btype
 
+    @memoized
     def identifiers(self):
         """
         Pull the identifiers.  This should be common to all types.
         """
         out = []
         #Identifiers - using both the standard and what's found in typical OpenURLs
-        ids = self._find_key_values(['rft.id',
-                                     'rft_id',
-                                     'id',
-                                     'doi',
-                                     'pmid',
-                                     'pid',
-                                     'rfe_dat'])
-        for k, values in ids:
+        for k, values in self._field_values('id'):
             for v in values:
-                #Remove line breaks from values.
-                v = v.replace('\n', '')
-                if v == '':
-                    continue
-                d = {}
-                d['id'] = None
-                d['type'] = None
-                #DOIS and PMIDS in the id
-                if (k == 'rft.id') or (k == 'rft_id') or (k == 'id'):
-                    if v.startswith('info:doi/'):
-                        #referent['doi'] = v.lstrip('info:doi/')
-                        d['type'] = 'doi'
-                        d['id'] = 'doi:%s' % v.lstrip('info:doi/')
-                    elif v.startswith('doi:'):
-                        d['type'] = 'doi'
-                        d['id'] = '%s' % v
-                    elif v.startswith('info:pmid/'):
-                        d['type'] = 'pmid'
-                        d['id'] = v
-                    #Handle pubmed IDs coming in like this pmid:18539564
-                    elif v.startswith('pmid'):
-                        d['type'] = 'pmid'
-                        d['id'] = 'info:%s' % v.replace(':', '/')
-                #OCLC
-                #elif (((k == 'rfe_dat') or (k =='pid')) and ('accessionnumber' in v)):
-                #    d['type'] = 'oclc'
-                #    d['id'] = v.replace('<accessionnumber>', '').replace('</accessionnumber>', '')
-                #Other ids from the wild
-                elif k == 'pmid':
-                    d['type'] = 'pmid'
-                    d['id'] = v
-                elif k == 'doi':
-                    d['type'] = 'doi'
-                    d['id'] = 'doi:%s' % v
-                #Check for blank dois
-                if d['id'] == 'doi:':
-                    continue
-                #If we found an id add it to the output.
-                if d['id']:
-                    out.append(d)
-        #ISBNS and ISSNs are more straightforward so will handle them separately.
-        for isbn in self._find_repeating_key(['rft.isbn', 'isbn']):
-            #These are repated on occassion
-            for isn in isbn.split():
-                out.append({'type': 'isbn',
-                            'id': isn})
-        for issn in self._find_repeating_key(['rft.issn', 'issn']):
-            #These are repated on occassion
-            for isn in issn.split():
-                out.append({'type': 'issn',
-                            'id': isn})
-        for eissn in self._find_repeating_key(['rft.eissn', 'eissn']):
-            out.append({'type': 'eissn',
-                        'id': eissn})
+                out.extend(classify(k, v))
+        #ISBNS and ISSNs are more straightforward, only the duplicates across keys are dropped.
+        for field in ('isbn', 'issn', 'eissn'):
+            for v in self._field_repeating(field):
+                out.extend(classify(field, v))
         #OCLCs
-        oclc = pull_oclc(self.data)
-        if (oclc) and (oclc not in out):
+        inst = instruments
+        if inst is None:
+            oclc = pull_oclc(self.data)
+        else:
+            start = time.time()
+            oclc = pull_oclc(self.data)
+            inst.record('pull_oclc', time.time() - start)
+        if oclc:
             out.append({'type': 'oclc', 'id': oclc})
         return out
 
+    @memoized
     def titles(self):
         out = {}
         #Article or book titles will be set to bibjson title.
         #These are in order of prefernce, short titles are last.
-        out['title'] = self._find_key(
-            [
-                'rft.atitle',
-                'atitle',
-                'rft.btitle',
-                'btitle',
-                'rft.title',
-                'title',
-                #Abbreviated or short journal title. This is used for journal title abbreviations, where known, i.e. "J Am Med Assn"
-                'stitle',
-                'rft.stitle'
-            ]
-        )
+        #Abbreviated or short journal title is the last resort. This is used for journal title abbreviations, where known, i.e. "J Am Med Assn"
+        out['title'] = self._field('title')
         #Journal title
         if self.type in ['article', 'inbook']:
-            jtitle = self._find_key(['rft.jtitle',
-                                     'jtitle',
-                                     'rft.btitle',
-                                     'btitle',
-                                     'rft.title',
-                                     'title'])
+            jtitle = self._field('jtitle')
             if jtitle:
                 ti = {'name': jtitle}
                 #Try to pull short title code.
-                stitle = self.data.get('rft.stitle', None)
-                if not stitle:
-                    stitle = self.data.get('stitle', None)
+                stitle = self._field('stitle')
                 if stitle:
-                    ti['shortcode'] = stitle[0]
+                    ti['shortcode'] = stitle
                 out['journal'] = ti
         return out
 
+    @memoized
     def authors(self):
         """
         Pull authors.  Less straightforward than you might think.
+        Full names (au) are matched up with the aulast/aufirst/auinitm parts
+        by last name; see bibjsontools.authors.
         """
-        out = []
-        authors = self._find_key_values([
-                                        'rft.au',
-                                        'au',
-                                        'rft.aulast',
-                                        'aulast',
-                                        'rft.auinitm',
-                                        'auinitm'])
-        for k,values in authors:
-            for v in values:
-                if (k == 'rft.au') or (k == 'au') or\
-                    (k == 'rft.aulast') or (k == 'aulast'):
-                    #If it's a full name, set here.
-                    if (k == 'rft.au') or (k == 'au'):
-                        au = {'name': v}
-                    else:
-                        au = {}
-                    aulast = self._find_key(['rft.aulast', 'aulast'])
-                    if aulast:
-                        au['lastname'] = aulast
-                    aufirst = self._find_key(['rft.aufirst', 'aufirst'])
-                    if aufirst:
-                        au['firstname'] = aufirst
-                    auinitm = self._find_key( ['rft.auinitm', 'auinitm'] )
-                    if auinitm:
-                        au['_minitial'] = auinitm
-                    #Put the full name (minus middlename) together now if we can.
-                    if not au.has_key('name'):
-                        #If there isn't a first and last name, just use last.
-                        last = au.get('lastname', '')
-                        first = au.get('firstname', '')
-                        name = '%s, %s' % (last, first.strip())
-                        au['name'] = name.rstrip(', ')
-                    #Don't duplicate authors
-                    if au not in out:
-                        out.append(au)
-        return out
-
+        names = []
+        for k, values in self._field_values('au'):
+            names += values
+        return build_authors(names,
+                             self._field_list('aulast'),
+                             self._field_list('aufirst'),
+                             self._field_list('auinitm'))
+
+    @memoized
     def pages(self):
         """
         Try to set start, end page and pages.
         """
         out = {}
         #Pages
-        out['pages'] = self._find_key(['rft.pages', 'pages'])
-        start = self._find_key(['rft.spage', 'spage'])
-        end = self._find_key(['rft.epage', 'epage'])
+        out['pages'] = self._field('pages')
+        start = self._field('spage')
+        end = self._field('epage')
         if (not out['pages']):
             if start:
                 #Default end_page is EOA - end of article
@@ -296,78 +361,320 @@ class OpenURLParser(object):
 
         return out
 
+    @memoized
     def rfr(self):
         """
         Get the referring site.
         """
         #try the usual suspects
-        r = self._find_key(['rfr_id', 'sid', 'id'])
+        r = self._field('rfr')
         if r:
             return r
 
 
-    def parse(self):
+    def _stage(self, stage, compact=False):
         """
-        Create and return the bibjson.
+        The bibjson keys and values one stage of parse() produces, empty
+        values included.  Lists and dicts are copies of the memoized ones,
+        so callers changing the result don't change the parser; with compact
+        they are the tuples and records a BibRecord holds instead.
         """
-        #from pprint import pprint
-        #pprint(self.data)
-        d = {}
-        d['type'] = self.type
-        #Referrer
-        d['_rfr'] = self.rfr()
-        d['identifier'] = self.identifiers()
-        d.update(self.titles())
-        d['author'] = self.authors()
+        shared = self._shared
+        if stage == 'type':
+            return {'type': self.type}
+        elif stage == 'rfr':
+            #Referrer
+            return {'_rfr': shared('rfr')}
+        elif stage == 'identifiers':
+            if compact:
+                return {'identifier': tuple(Identifier(**idt) for idt in shared('identifiers'))}
+            return {'identifier': [dict(idt) for idt in shared('identifiers')]}
+        elif stage == 'titles':
+            out = dict(shared('titles'))
+            if 'journal' in out:
+                out['journal'] = Journal(**out['journal']) if compact else dict(out['journal'])
+            return out
+        elif stage == 'authors':
+            if compact:
+                return {'author': tuple(Author(**author) for author in shared('authors'))}
+            return {'author': [dict(author) for author in shared('authors')]}
+        elif stage == 'pages':
+            return dict(shared('pages'))
+        out = {}
         #Publisher
-        d['publisher'] = self._find_key(['rft.pub', 'pub', 'rft.publisher', 'publisher'])
+        out['publisher'] = self._field('publisher')
         #Place - not sure how BibJSON would officially handle this
-        d['place_of_publication'] = self._find_key(['rft.place', 'place'])
+        out['place_of_publication'] = self._field('place')
         #Volume
-        d['volume'] = self._find_key(['rft.volume', 'volume'])
+        out['volume'] = self._field('volume')
         #Issue
-        d['issue'] = self._find_key(['rft.issue', 'issue'])
+        out['issue'] = self._field('issue')
         #Date/Year
-        year = self._find_key(['rft.date', 'date'])
+        year = self._field('date')
         if year:
-            d['year'] = year[:4]
-        #Pages
-        d.update(self.pages())
-        #Remove empty keys - except those in the required keys list.
-        for k,v in d.items():
-            if not v:
-                if k in REQUIRED_KEYS:
-                    #Set to unknown
-                    d[k] = 'Unknown'
-                else:
-                    del d[k]
-        #add the original openurl
-        log.debug( 'd before being sent to BibJSONToOpenURL, ```%s```' % pprint.pformat(d) )
-        d['_openurl'] = BibJSONToOpenURL(d).parse()
+            out['year'] = year[:4]
+        return out
+
+    def parse(self, compact=False, fields=None):
+        """
+        Create and return the bibjson.
+        With compact, return a read-only BibRecord instead of a dict.
+        With fields, a list of bibjson keys, only the stages those keys need
+        are run and only those keys are returned; _openurl needs them all.
+        """
+        inst = instruments
+        start = time.time() if inst is not None else None
+        if (fields is None) or ('_openurl' in fields):
+            stages = STAGES
+        else:
+            stages = set(_key_stage(k) for k in fields)
+        d = {}
+        for stage in stages:
+            d.update(self._stage(stage, compact))
+        _drop_empty(d)
+        if stages is STAGES:
+            #add the original openurl
+            if tracer is not None:
+                tracer('parser.parse', bib=d)
+            d['_openurl'] = BibJSONToOpenURL(d).parse()
+        if fields is not None:
+            d = dict((k, d[k]) for k in fields if k in d)
+        if compact:
+            d = BibRecord(**d)
+        if inst is not None:
+            inst.record('parse', time.time() - start)
         return d
 
-def from_openurl(query):
+    def lazy(self):
+        """
+        The bibjson as a LazyBib, which runs each stage of parse() the first
+        time one of its keys is read.
+        """
+        return LazyBib(self)
+
+#parse() stages, in the order they run, and the bibjson keys each produces.
+STAGES = ('type', 'rfr', 'identifiers', 'titles', 'authors', 'imprint', 'pages')
+KEY_STAGES = {
+    'type': 'type',
+    '_rfr': 'rfr',
+    'identifier': 'identifiers',
+    'title': 'titles',
+    'journal': 'titles',
+    'author': 'authors',
+    'publisher': 'imprint',
+    'place_of_publication': 'imprint',
+    'volume': 'imprint',
+    'issue': 'imprint',
+    'year': 'imprint',
+    'pages': 'pages',
+    'start_page': 'pages',
+    'end_page': 'pages',
+}
+
+def _key_stage(key):
+    try:
+        return KEY_STAGES[key]
+    except KeyError:
+        raise ValueError('not a bibjson field: %r' % key)
+
+def _drop_empty(d):
+    """
+    Remove empty keys - except those in the required keys list.
+    """
+    for k,v in d.items():
+        if not v:
+            if k in REQUIRED_KEYS:
+                #Set to unknown
+                d[k] = 'Unknown'
+            else:
+                del d[k]
+
+
+class LazyBib(collections.Mapping):
+    """
+    Read-only bibjson from an OpenURLParser, computed a stage at a time.
+    bib['type'] only works out the type; iterating, len(), to_dict() or
+    reading _openurl run everything and give what parse() would.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self._d = {}
+        self._done = set()
+
+    def _run(self, stage):
+        if stage not in self._done:
+            values = dict(self.parser._stage(stage))
+            _drop_empty(values)
+            self._d.update(values)
+            self._done.add(stage)
+
+    def _run_all(self):
+        if '_openurl' not in self._d:
+            for stage in STAGES:
+                self._run(stage)
+            if tracer is not None:
+                tracer('parser.parse', bib=self._d)
+            self._d['_openurl'] = BibJSONToOpenURL(self._d).parse()
+
+    def __getitem__(self, key):
+        if key == '_openurl':
+            self._run_all()
+        elif key in KEY_STAGES:
+            self._run(KEY_STAGES[key])
+        return self._d[key]
+
+    def __iter__(self):
+        self._run_all()
+        return iter(self._d)
+
+    def __len__(self):
+        self._run_all()
+        return len(self._d)
+
+    def to_dict(self):
+        """
+        A plain dict, e.g. for json.dumps.
+        """
+        self._run_all()
+        return dict(self._d)
+
+    def __repr__(self):
+        return 'LazyBib(%r)' % self._d
+
+    # end class LazyBib()
+
+def from_openurl(query, compact=False, fields=None):
     """
     Alias/shortcut to parse the provided query.
     """
-    log.debug( 'query, ```%s```' % pprint.pformat(query) )
+    if tracer is not None:
+        tracer('from_openurl', query=query)
     b = OpenURLParser(query)
-    log.debug( 'b, ```%s```' % pprint.pformat(b) )
-    return b.parse()
+    return b.parse(compact, fields)
 
-def from_dict(request_dict):
+def from_dict(request_dict, compact=False, fields=None):
     """
     Alias/shortcut to handle dictionary inputs.
     Use for this is passing Django request.GET as dict.
     """
     b = OpenURLParser('', query_dict=request_dict)
-    return b.parse()
+    return b.parse(compact, fields)
+
+def _parse_chunk(queries):
+    """
+    Worker side of from_openurls.
+    """
+    return [from_openurl(q) for q in queries]
+
+def map_chunks(func, items, workers=None, chunksize=100, max_chunks=None):
+    """
+    Apply func to chunks (lists) of items, yielding each result in input
+    order.  func must return one result per item and, to run in the worker
+    processes, be a module level function.  At most max_chunks (default:
+    twice the workers) are in flight at once so the input is never read
+    far ahead of the output.
+    Inputs smaller than one chunk, or workers=1, are handled in process.
+    """
+    items = iter(items)
+    chunk = list(itertools.islice(items, chunksize))
+    if (workers == 1) or (len(chunk) < chunksize):
+        while chunk:
+            for result in func(chunk):
+                yield result
+            chunk = list(itertools.islice(items, chunksize))
+        return
+    import multiprocessing
+    workers = workers or multiprocessing.cpu_count()
+    max_chunks = max_chunks or (workers * 2)
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = collections.deque()
+        while chunk:
+            pending.append(pool.apply_async(func, (chunk,)))
+            if len(pending) >= max_chunks:
+                for result in pending.popleft().get():
+                    yield result
+            chunk = list(itertools.islice(items, chunksize))
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+def from_openurls(queries, workers=None, chunksize=100, max_chunks=None):
+    """
+    Parse an iterable of OpenURL queries, yielding bibjson in input order.
+    Chunks of queries are handed to a pool of worker processes; see
+    map_chunks.
+    """
+    return map_chunks(_parse_chunk, queries, workers, chunksize, max_chunks)
+
+#Handle unicode and url quoting.
+#See - http://stackoverflow.com/questions/120951/how-can-i-normalize-a-url-in-python
+#http://stackoverflow.com/a/8152242
+#Values made only of these characters need no quoting beyond space => +.
+#\Z rather than $, which also matches before a trailing newline.
+SAFE_VALUE = re.compile(r'^[A-Za-z0-9_.\-/ ]*\Z')
+
+#Byte value => its quote_plus(safe='/') form.  Quoting here rather than with
+#urllib keeps urllib, which pulls in socket and ssl, out of the import.
+QUOTED_BYTES = ['%%%02X' % i for i in range(256)]
+for _c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-/':
+    QUOTED_BYTES[ord(_c)] = _c
+QUOTED_BYTES[ord(' ')] = '+'
+del _c
+
+def quote_value(v):
+    """
+    quote_plus a unicode key or value, keeping / as is.
+    """
+    if SAFE_VALUE.match(v):
+        return v.replace(' ', '+')
+    return ''.join([QUOTED_BYTES[b] for b in bytearray(v.encode('utf-8', 'ignore'))])
+
+def _kev_template(constants, keys):
+    """
+    Pre-quote the fixed part of an OpenURL and the names of its other keys.
+    """
+    prefix = '&'.join('%s=%s' % (quote_value(k), quote_value(v)) for k, v in constants)
+    return prefix, tuple((k, quote_value(k) + '=') for k in keys)
+
+#Keys written for every type, after the type specific ones.
+COMMON_KEVS = ('rfr_id', 'rft.au', 'rft.aulast', 'rft.date', 'rft.volume',
+               'rft.issue', 'rft.spage', 'rft.end_page', 'rft.pages',
+               'rft.pub', 'rft.place', 'rft.isbn', 'rft.issn', 'rft.eissn',
+               'rft_id')
+
+#Per type - the constant keys and values, then the keys that may follow.
+KEV_TEMPLATES = {}
+for _type, _constants, _keys in (
+        ('article',
+         (('rft_val_fmt', 'info:ofi/fmt:kev:mtx:journal'), ('rft.genre', 'article')),
+         ('rft.atitle', 'rft.jtitle', 'rft.stitle')),
+        ('book',
+         (('rft_val_fmt', 'info:ofi/fmt:kev:mtx:book'), ('rft.genre', 'book')),
+         ('rft.btitle',)),
+        ('inbook',
+         (('rft_val_fmt', 'info:ofi/fmt:kev:mtx:book'), ('rft.genre', 'bookitem')),
+         ('rft.atitle', 'rft.btitle', 'title')),
+        ('dissertation',
+         (('rft.genre', 'dissertation'),),
+         ('rft.title',)),
+        ('unknown',
+         (('rft.genre', 'unknown'),),
+         ('rft.title', 'rft.jtitle', 'rft.stitle'))):
+    KEV_TEMPLATES[_type] = _kev_template(
+        (('ctx_ver', 'Z39.88-2004'),) + _constants,
+        _keys + COMMON_KEVS)
+del _type, _constants, _keys
 
 class BibJSONToOpenURL(object):
     def __init__(self, bibjson):
         self.data = bibjson
-        log.debug( 'type(self.data), `%s`' % type(self.data) )
-        log.debug( 'self.data, ```%s```' % pprint.pformat(self.data) )
+        if tracer is not None:
+            tracer('to_openurl.init', bib=bibjson)
 
     def parse(self):
         #return self.data
@@ -386,37 +693,32 @@ class BibJSONToOpenURL(object):
         pages => 361--71
         end_page => 71
         """
+        inst = instruments
+        start = time.time() if inst is not None else None
         bib = self.data
-        out = {}
-        out['ctx_ver'] = 'Z39.88-2004'
         btype = bib['type']
+        prefix, keys = KEV_TEMPLATES.get(btype, KEV_TEMPLATES['unknown'])
         title = bib.get('title')
+        out = {}
         #By default we will treat unknowns as articles for now.
         if (btype == 'article'):
-            out['rft_val_fmt'] = 'info:ofi/fmt:kev:mtx:journal'
             out['rft.atitle'] = title
             jrnl = bib.get('journal', {})
             out['rft.jtitle'] = jrnl.get('name', '')
             out['rft.stitle'] = jrnl.get('shortcode')
-            out['rft.genre'] = 'article'
-        elif (btype == 'book') or (btype == 'inbook'):
-            out['rft_val_fmt'] = 'info:ofi/fmt:kev:mtx:book'
+        elif (btype == 'book'):
             out['rft.btitle'] = title
-            out['rft.genre'] = 'book'
-            if btype == 'inbook':
-                out['rft.genre'] = 'bookitem'
-                jrnl = bib.get('journal', {})
-                out['rft.btitle'] = jrnl.get('name')
-                #For Illiad add as title
-                out['title'] = jrnl.get('name')
-                out['rft.atitle'] = bib.get('title', 'unknown')
+        elif (btype == 'inbook'):
+            jrnl = bib.get('journal', {})
+            out['rft.btitle'] = jrnl.get('name')
+            #For Illiad add as title
+            out['title'] = jrnl.get('name')
+            out['rft.atitle'] = bib.get('title', 'unknown')
         elif (btype == 'dissertation'):
-            out['rft.genre'] = 'dissertation'
-            out['rft.title'] = bib.get('title')
+            out['rft.title'] = title
         else:
             #Try to fill in a title for unkowns
-            out['rft.genre'] = 'unknown'
-            out['rft.title'] = bib.get('title')
+            out['rft.title'] = title
             jrnl = bib.get('journal', {})
             out['rft.jtitle'] = jrnl.get('name')
             out['rft.stitle'] = jrnl.get('shortcode')
@@ -449,7 +751,7 @@ class BibJSONToOpenURL(object):
             elif idt['type'] == 'eissn':
                 out['rft.eissn'] = idt['id']
             elif idt['type'] == 'doi':
-                out['rft_id'] = 'info:doi/%s' % idt['id'].strip('doi:')
+                out['rft_id'] = 'info:doi/%s' % DOI_PREFIX.sub('', idt['id'])
             elif idt['type'] == 'pmid':
                 #don't add the info:pmid if not necessary
                 v = idt['id']
@@ -459,62 +761,21 @@ class BibJSONToOpenURL(object):
                     out['rft_id'] = 'info:pmid/%s' % idt['id']
             elif idt['type'] == 'oclc':
                 out['rft_id'] = 'http://www.worldcat.org/oclc/%s' % idt['id']
-        #Remove empty keys
-        for k,v in out.items():
-            if (not v) or (v == ''):
-                del out[k]
-        #Handle unicode and url quoting.
-        #See - http://stackoverflow.com/questions/120951/how-can-i-normalize-a-url-in-python
-        #http://stackoverflow.com/a/8152242
-        kevs = []
-        log.debug( 'out before k-v processing, ```%s```' % pprint.pformat(out) )
-        for k,v in out.iteritems():
-            # if isinstance(v, unicode):
-            #     v = v.encode('utf-8', 'ignore')
-            log.debug( 'k,v -- ```%s, %s```' % (k,v) )
-            log.debug( 'type(k), type(v) -- `%s, %s`' % (type(k), type(v)) )
-            k8 = k.encode( 'utf-8', 'ignore' )
-            v8 = v.encode( 'utf-8', 'ignore' )
-            safe8 = '/'.encode( 'utf-8' )
-            _k = urllib.quote_plus( k8, safe=safe8 )
-            _v = urllib.quote_plus( v8, safe=safe8 )
-            log.debug( 'type(_k), type(_v), `%s, %s`' % (type(_k), type(_v)) )
-            kevs.append( '%s=%s' % (_k.decode('utf-8'), _v.decode('utf-8')) )
-        log.debug( 'kevs, ```%s```' % pprint.pformat(kevs) )
+        #Write the non-empty keys in the template's order.
+        kevs = [prefix]
+        for k, quoted_k in keys:
+            v = out.get(k)
+            if v:
+                kevs.append(quoted_k + quote_value(v))
         openurl = '&'.join( kevs )
-        log.debug( 'openurl, ```%s```' % openurl )
+        if tracer is not None:
+            tracer('to_openurl.parse', kevs=out, openurl=openurl)
+        if inst is not None:
+            inst.record('to_openurl', time.time() - start)
         return openurl
 
 
 
-def pull_oclc(odict):
-    """
-    Pull OCLC numbers from incoming FirstSearch/Worldcat urls.
-    """
-    import re
-    oclc_reg = re.compile('\d+')
-    oclc = None
-    if odict.get('rfr_id', ['null'])[0].rfind('firstsearch') > -1:
-        oclc = odict.get('rfe_dat', ['null'])[0]
-        match = oclc_reg.search(oclc)
-        if match:
-            oclc = match.group()
-            return oclc
-    #Try pid
-    spot = odict.get('pid', ['null'])[0]
-    if spot.rfind('accession') > -1:
-        match = oclc_reg.search(spot)
-        if match:
-            oclc = match.group()
-            return oclc
-    #rfe_dat - these are probably OCLC numbers in most cases.
-    dat = odict.get('rfe_dat')
-    if (dat) and ('accessionnumber' in dat[0]):
-        match = oclc_reg.search(dat[0])
-        if match:
-            return match.group()
-    return oclc
-
 def to_openurl(bib):
     out = BibJSONToOpenURL(bib)
     return out.parse()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Compact, read-only bibjson records.
+BibRecord holds the fields OpenURLParser.parse() produces in __slots__,
+with identifiers and authors as tuples, and reads like the dict parse()
+returns - code using bib['title'], bib.get('journal', {}) and so on,
+including ris.convert and BibJSONToOpenURL, works unchanged.
+
+    >>> bib = from_openurl(query, compact=True)
+    >>> json.dumps(bib.to_dict())
+"""
+
+from collections import Mapping
+
+
+class SlotMapping(object):
+    """
+    A read-only Mapping over __slots__.  Slots set to None are absent keys;
+    assigning to one after construction raises AttributeError.
+    """
+    __slots__ = ()
+    #Types that nested values are converted to, by key.
+    nested = {}
+
+    def __init__(self, **kwargs):
+        for k in self.__slots__:
+            object.__setattr__(self, k, kwargs.get(k))
+
+    def __setattr__(self, key, value):
+        raise AttributeError('%s is read-only' % self.__class__.__name__)
+
+    def __delattr__(self, key):
+        raise AttributeError('%s is read-only' % self.__class__.__name__)
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Build from a plain bibjson dict.
+        """
+        kwargs = {}
+        for k, v in d.items():
+            if k not in cls.__slots__:
+                continue
+            convert = cls.nested.get(k)
+            if convert is not None:
+                v = convert(v)
+            kwargs[k] = v
+        return cls(**kwargs)
+
+    def to_dict(self):
+        """
+        Plain dicts and lists all the way down, e.g. for json.dumps.
+        """
+        out = {}
+        for k, v in self.items():
+            if isinstance(v, SlotMapping):
+                v = v.to_dict()
+            elif isinstance(v, tuple):
+                v = [i.to_dict() for i in v]
+            out[k] = v
+        return out
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            v = getattr(self, key)
+            if v is not None:
+                return v
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return (key in self.__slots__) and (getattr(self, key) is not None)
+
+    def __iter__(self):
+        for k in self.__slots__:
+            if getattr(self, k) is not None:
+                yield k
+
+    def __len__(self):
+        return len(self.keys())
+
+    def keys(self):
+        return list(iter(self))
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self]
+
+    def values(self):
+        return [getattr(self, k) for k in self]
+
+    iterkeys = __iter__
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if isinstance(other, SlotMapping):
+            other = other.to_dict()
+        #Plain dicts use lists where records use tuples.
+        return self.to_dict() == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            object.__setattr__(self, k, v)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, dict(self.items()))
+
+Mapping.register(SlotMapping)
+
+
+class Identifier(SlotMapping):
+    __slots__ = ('type', 'id')
+
+
+class Author(SlotMapping):
+    __slots__ = ('name', 'lastname', 'firstname', '_minitial')
+
+
+class Journal(SlotMapping):
+    __slots__ = ('name', 'shortcode')
+
+
+class BibRecord(SlotMapping):
+    __slots__ = ('type', 'title', 'journal', 'author', 'identifier',
+                 'publisher', 'place_of_publication', 'volume', 'issue',
+                 'year', 'pages', 'start_page', 'end_page', '_rfr',
+                 '_openurl')
+    nested = {
+        'journal': Journal.from_dict,
+        'author': lambda authors: tuple(Author.from_dict(a) for a in authors),
+        'identifier': lambda ids: tuple(Identifier.from_dict(i) for i in ids),
+    }
@@ -3,228 +3,327 @@
 from __future__ import unicode_literals
 
 """
-Convert from BibJSON to RIS file-format
+Convert from BibJSON to RIS file-format, and read RIS back into BibJSON
 - [BibJSON]( http://okfnlabs.org/bibjson/ )
 - [RIS]( https://en.wikipedia.org/wiki/RIS_(file_format) )
 Adapted from <https://github.com/okfn/bibserver/blob/master/parserscrapers_plugins/RISParser.py>
 """
 
-from bibjsontools import from_openurl
+import mmap, os, re
+
+from bibjsontools.identifiers import NOT_ISN
+from bibjsontools.openurl import REQUIRED_KEYS, to_openurl
+
+
+FIELD_MAP = {
+    'access date': 'Y2',
+    'accession number': 'AN',
+    'alternate title': 'J2',
+    'author': 'AU',
+    'call number': 'CN',
+    'caption': 'CA',
+    'custom 3': 'C3',
+    'custom 4': 'C4',
+    'custom 5': 'C5',
+    'custom 7': 'C7',
+    'custom 8': 'C8',
+    'database provider': 'DP',
+    'date': 'DA',
+    'doi': 'DO',
+    'epub date': 'ET',
+    'figure': 'L4',
+    'file attachments': 'L1',
+    'institution': 'AD',
+    'issn': 'SN',
+    'issue': 'IS',
+    'journal': 'JF',
+    'keyword': 'KW',
+    'label': 'LB',
+    'language': 'LA',
+    'name of database': 'DB',
+    'nihmsid': 'C6',
+    'note': 'AB',
+    'notes': 'N1',
+    'number': 'IS',
+    'number of volumes': 'NV',
+    'original publication': 'OP',
+    'pages': 'SP',
+    'place published': 'CY',
+    'pmcid': 'C2',
+    'publisher': 'PB',
+    'reprint edition': 'RP',
+    'reviewed item': 'RI',
+    'secondary title': 'T2',
+    'section': 'SE',
+    'short title': 'ST',
+    'start page': 'M2',
+    'subsidiary author': 'A4',
+    'tertiary author': 'A3',
+    'tertiary title': 'T3',
+    'title': 'TI',
+    'translated author': 'TA',
+    'translated title': 'TT',
+    'type ': 'TY',
+    'url': 'UR',
+    'volume': 'VL',
+    'year': 'PY'
+    }
+
+RIS_TYPES = {
+    'article': 'JOUR',
+    'book': 'BOOK',
+    }
+
+ID_TAGS = {
+    'doi': 'DO',
+    'issn': 'SN',
+    'isbn': 'SN',
+    }
+
+
+## writing RIS ##
+
+def _field_handler( ris_k ):
+    """ Returns a handler tagging a plain value.
+        Called by compile_field_map() """
+    def handler( value ):
+        if value:
+            return [ (ris_k, value) ]
+        return []
+    return handler
+
+def _author_handler( author_list ):
+    """ Every author with a name gets an AU line. """
+    return [ ('AU', author['name']) for author in author_list if author.get('name') ]
+
+def _journal_handler( journal ):
+    """ The journal name goes in JF. """
+    name = journal.get( 'name' )
+    if name:
+        return [ ('JF', name) ]
+    return []
+
+def _identifier_handler( identifier_list ):
+    """ DOIs go in DO, ISSNs and ISBNs in SN. """
+    out = []
+    for identifier_dct in identifier_list:
+        ris_k = ID_TAGS.get( identifier_dct['type'] )
+        if ris_k:
+            out.append( (ris_k, identifier_dct['id']) )
+    return out
+
+def compile_field_map( field_map ):
+    """ Compiles a bibjson key => RIS tag table into bibjson key => handler.
+        Each handler takes the bibjson value and returns (tag, value) pairs. """
+    compiled = {}
+    for bib_k, ris_k in field_map.items():
+        compiled[bib_k] = _field_handler( ris_k )
+    compiled['author'] = _author_handler
+    compiled['journal'] = _journal_handler
+    compiled['identifier'] = _identifier_handler
+    return compiled
+
+COMPILED_FIELD_MAP = compile_field_map( FIELD_MAP )
+
+
+def ris_pairs( bib ):
+    """ Returns the (tag, value) pairs of a RIS record for bibjson, TY first.
+        Only the keys the record has are looked up; every author and
+        ISSN/ISBN gets its own AU/SN pair. """
+    pairs = [ ('TY', RIS_TYPES.get( bib['type'], 'GENERIC' )) ]
+    for k in sorted( bib ):
+        handler = COMPILED_FIELD_MAP.get( k )
+        if handler is not None:
+            pairs.extend( handler(bib[k]) )
+    return pairs
+
+def to_ris_dict( bib ):
+    """ Converts bibjson to a dict of RIS tag => value.
+        Only one value fits per tag, so AU is the first author and SN/DO the last ISSN/ISBN/DOI. """
+    ris_dct = {}
+    for ris_k, ris_v in ris_pairs( bib ):
+        if ris_k == 'AU':
+            ris_dct.setdefault( ris_k, ris_v )
+        else:
+            ris_dct[ris_k] = ris_v
+    return ris_dct
+
+def convert( bib ):
+    """ Converts bibjson to RIS text for import into various utilities.
+        See write_ris() for more than one record. """
+    return ''.join( [ '%s  - %s\n' % pair for pair in ris_pairs(bib) ] )
+
+def convert_record( bib ):
+    """ Converts bibjson to one complete RIS record, ER line included,
+        as write_ris() writes it. """
+    return convert( bib ) + 'ER  - \n\n'
+
+def write_ris( records, fileobj ):
+    """ Streams bibjson records to a file object as RIS, one record at a time.
+        fileobj must accept unicode, eg io.open( path, 'w', encoding='utf-8' ).
+        Returns the number of records written. """
+    count = 0
+    for bib in records:
+        fileobj.write( convert_record(bib) )
+        count += 1
+    return count
 
 
 class RISMaker( object ):
+    """ Converts bibjson to a dict of RIS values.
+        Holds no state; the work is done by the compiled FIELD_MAP. """
 
-    def __init__(self):
-        self.FIELD_MAP = {
-            'access date': 'Y2',
-            'accession number': 'AN',
-            'alternate title': 'J2',
-            'author': 'AU',
-            'call number': 'CN',
-            'caption': 'CA',
-            'custom 3': 'C3',
-            'custom 4': 'C4',
-            'custom 5': 'C5',
-            'custom 7': 'C7',
-            'custom 8': 'C8',
-            'database provider': 'DP',
-            'date': 'DA',
-            'doi': 'DO',
-            'epub date': 'ET',
-            'figure': 'L4',
-            'file attachments': 'L1',
-            'institution': 'AD',
-            'issn': 'SN',
-            'issue': 'IS',
-            'journal': 'JF',
-            'keyword': 'KW',
-            'label': 'LB',
-            'language': 'LA',
-            'name of database': 'DB',
-            'nihmsid': 'C6',
-            'note': 'AB',
-            'notes': 'N1',
-            'number': 'IS',
-            'number of volumes': 'NV',
-            'original publication': 'OP',
-            'pages': 'SP',
-            'place published': 'CY',
-            'pmcid': 'C2',
-            'publisher': 'PB',
-            'reprint edition': 'RP',
-            'reviewed item': 'RI',
-            'secondary title': 'T2',
-            'section': 'SE',
-            'short title': 'ST',
-            'start page': 'M2',
-            'subsidiary author': 'A4',
-            'tertiary author': 'A3',
-            'tertiary title': 'T3',
-            'title': 'TI',
-            'translated author': 'TA',
-            'translated title': 'TT',
-            'type ': 'TY',
-            'url': 'UR',
-            'volume': 'VL',
-            'year': 'PY'
-            }
+    FIELD_MAP = FIELD_MAP
 
     def convert_to_ris( self, bib_dct ):
         """ Converts bibjson data to ris data. """
-        # ris_dct = {}
-        # ris_dct['TY'] = self._handle_type( bib_dct['type'] )
-        ris_dct = self._handle_type( bib_dct['type'] )
-        for k,v in bib_dct.items():
-            if k == 'author':
-                ris_dct = self._check_author( ris_dct, v )
-            elif k == 'journal':
-                ris_dct['JF'] = v.get('name')
-            elif k == 'identifier':
-                ris_dct = self._check_identifier( ris_dct, v )
-            else:
-                ris_dct = self._apply_mapper( ris_dct, k, bib_dct )
-        return ris_dct
-
-    def _handle_type( self, item_type ):
-        """ Initializes ris_dct & selfets ris_dct['TY'].
-            Called by convert_to_ris() """
-        if item_type == 'article':
-            ris_type = 'JOUR'
-        elif item_type == 'book':
-            ris_type = 'BOOK'
-        else:
-            ris_type = 'GENERIC'
-        ris_dct = { 'TY': ris_type }
-        return ris_dct
-
-    def _check_author( self, ris_dct, author_list ):
-        """ Checks author value (a list of dcts).
-            Called by convert_to_ris() """
-        for author in author_list:
-            name = author.get( 'name' )
-            if name:
-                ris_dct['AU'] = name
-                break
-        return ris_dct
-
-    def _check_identifier( self, ris_dct, identifier_list ):
-        """ Checks identifier value (a list of dcts).
-            Called by convert_to_ris() """
-        for identifier_dct in identifier_list:
-            id_value = identifier_dct['id']
-            if identifier_dct['type'] == 'doi':
-                ris_dct['DO'] = id_value
-            elif identifier_dct['type'] == 'issn':
-                ris_dct['SN'] = id_value
-            elif identifier_dct['type'] == 'isbn':
-                ris_dct['SN'] = id_value
-        return ris_dct
-
-    def _apply_mapper( self, ris_dct, bibjson_k, bib_dct ):
-        """ Checks FIELD_MAP with key-val.
-            Called by convert_to_ris() """
-        ris_k = self.FIELD_MAP.get( bibjson_k, None )
-        if ris_k:
-            ris_v = bib_dct.get( bibjson_k )
-            ris_dct[ris_k] = ris_v
-        return ris_dct
+        return to_ris_dict( bib_dct )
 
     # end class RISMaker()
 
 
-FIELD_MAP = {
-	'access date': 'Y2',
-	'accession number': 'AN',
-	'alternate title': 'J2',
-	'author': 'AU',
-	'call number': 'CN',
-	'caption': 'CA',
-	'custom 3': 'C3',
-	'custom 4': 'C4',
-	'custom 5': 'C5',
-	'custom 7': 'C7',
-	'custom 8': 'C8',
-	'database provider': 'DP',
-	'date': 'DA',
-	'doi': 'DO',
-	'epub date': 'ET',
-	'figure': 'L4',
-	'file attachments': 'L1',
-	'institution': 'AD',
-	'issn': 'SN',
-	'issue': 'IS',
-	'journal': 'JF',
-	'keyword': 'KW',
-	'label': 'LB',
-	'language': 'LA',
-	'name of database': 'DB',
-	'nihmsid': 'C6',
-	'note': 'AB',
-	'notes': 'N1',
-	'number': 'IS',
-	'number of volumes': 'NV',
-	'original publication': 'OP',
-	'pages': 'SP',
-	'place published': 'CY',
-	'pmcid': 'C2',
-	'publisher': 'PB',
-	'reprint edition': 'RP',
-	'reviewed item': 'RI',
-	'secondary title': 'T2',
-	'section': 'SE',
-	'short title': 'ST',
-	'start page': 'M2',
-	'subsidiary author': 'A4',
-	'tertiary author': 'A3',
-	'tertiary title': 'T3',
-	'title': 'TI',
-	'translated author': 'TA',
-	'translated title': 'TT',
-	'type ': 'TY',
-	'url': 'UR',
-	'volume': 'VL',
-	'year': 'PY'
-}
-
-def convert(bib):
-	"""
-	Convert BibJSON to the RIS format for import into various utilities.
-	To do: add some test cases.
-	"""
-	ris = {}
-	if bib['type'] == 'article':
-		ris['TY'] = 'JOUR'
-	elif bib['type'] == 'book':
-		ris['TY'] = 'BOOK'
-	else:
-		ris['TY'] = 'GENERIC'
-
-	for k,v in bib.items():
-		if k == 'author':
-			for author in v:
-				name = author.get('name')
-				if name:
-					ris['AU'] = name
-		elif k == 'journal':
-			ris['JF'] = v.get('name')
-		elif k == 'identifier':
-			for idt in v:
-				this = idt['id']
-				if idt['type'] == 'doi':
-					ris['DO'] = this
-				elif idt['type'] == 'issn':
-					ris['SN'] = this
-				elif idt['type'] == 'isbn':
-					ris['SN'] = this
-				#elif idt['type'] == 'pmid':
-				#	ris[]
-		else:
-			ris_k = FIELD_MAP.get(k, None)
-			if ris_k:
-				ris_v = bib.get(k)
-				ris[ris_k] = ris_v
-
-	out = ''
-	for k,v in ris.items():
-		out += '%s  - %s\n' % (k, v)
-	return out
+## reading RIS ##
+
+#FIELD_MAP keys that are also OpenURLParser.parse() keys.
+PARSE_KEYS = frozenset( ['title', 'author', 'journal', 'publisher', 'volume', 'issue', 'year', 'pages'] )
+
+#RIS tag => parse() key: the FIELD_MAP reversed for the keys parse() uses,
+#plus tags that are read but never written.  TY, DO, SN, J2 and DA are
+#handled by tag in ris_to_bib(); any other tag is dropped.
+REVERSE_FIELD_MAP = dict( (v, k) for k, v in FIELD_MAP.items() if k in PARSE_KEYS )
+REVERSE_FIELD_MAP.update( {
+    'T1': 'title',
+    'A1': 'author',
+    'JO': 'journal',
+    'T2': 'journal',
+    'CY': 'place_of_publication',
+    'Y1': 'year',
+    'EP': 'end_page',
+    } )
+
+REVERSE_RIS_TYPES = {
+    'JOUR': 'article',
+    'BOOK': 'book',
+    'CHAP': 'inbook',
+    'THES': 'dissertation',
+    }
+
+RIS_LINE = re.compile( r'^([A-Z][A-Z0-9])  -(?: (.*))?$' )
+
+#A page range: '125 - 141', '125--141' or '125-141'.  A hyphen between
+#anything but digits is part of a page id, such as e-123 or S12-3.
+PAGE_RANGE = re.compile( r'^(.+?)\s+-\s+(.+)$|^(.+?)\s*--\s*(.+)$|^(\d+)-(\d+)$' )
+
+
+def read_ris( source, encoding='utf-8' ):
+    """ Yields a bibjson dict for each ER-terminated RIS record.
+        source is a path, which is memory-mapped rather than read in, or an
+        iterable of lines such as an open file. """
+    if isinstance( source, basestring ):
+        with open( source, 'rb' ) as f:
+            if os.fstat( f.fileno() ).st_size == 0:
+                return
+            mapped = mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ )
+            try:
+                for bib in _read_records( iter(mapped.readline, b''), encoding ):
+                    yield bib
+            finally:
+                mapped.close()
+    else:
+        for bib in _read_records( source, encoding ):
+            yield bib
+
+def _read_records( lines, encoding ):
+    """ Groups lines into records of [tag, value] pairs.
+        Untagged lines continue the previous value.
+        Called by read_ris() """
+    pairs = []
+    for line in lines:
+        if isinstance( line, bytes ):
+            line = line.decode( encoding )
+        line = line.rstrip( '\r\n' ).lstrip( '\ufeff' )
+        match = RIS_LINE.match( line )
+        if match:
+            tag, value = match.groups()
+            if tag == 'ER':
+                if pairs:
+                    yield ris_to_bib( pairs )
+                pairs = []
+            else:
+                pairs.append( [tag, (value or '').strip()] )
+        elif line.strip() and pairs:
+            pairs[-1][1] += ' ' + line.strip()
+    #Unterminated last record.
+    if pairs:
+        yield ris_to_bib( pairs )
+
+def ris_to_bib( pairs ):
+    """ Builds a bibjson dict, shaped like OpenURLParser.parse() output, from (tag, value) pairs.
+        Called by read_ris() """
+    bib = { 'type': 'book', 'author': [], 'identifier': [] }
+    journal = {}
+    for tag, value in pairs:
+        if not value:
+            continue
+        key = REVERSE_FIELD_MAP.get( tag )
+        if tag == 'TY':
+            bib['type'] = REVERSE_RIS_TYPES.get( value, 'book' )
+        elif key == 'author':
+            author = { 'name': value }
+            if ',' in value:
+                last, first = value.split( ',', 1 )
+                author['lastname'] = last.strip()
+                if first.strip():
+                    author['firstname'] = first.strip()
+            bib['author'].append( author )
+        elif tag == 'J2':
+            journal['shortcode'] = value
+        elif key == 'journal':
+            journal.setdefault( 'name', value )
+        elif tag == 'DO':
+            if not value.startswith( 'doi:' ):
+                value = 'doi:%s' % value
+            bib['identifier'].append( {'type': 'doi', 'id': value} )
+        elif tag == 'SN':
+            for isn in value.split():
+                isn_type = 'issn' if len( NOT_ISN.sub('', isn.upper()) ) == 8 else 'isbn'
+                bib['identifier'].append( {'type': isn_type, 'id': isn} )
+        elif tag == 'DA':
+            bib.setdefault( 'year', value[:4] )
+        elif key == 'year':
+            bib['year'] = value[:4]
+        elif key:
+            bib.setdefault( key, value )
+    if journal.get( 'name' ):
+        bib['journal'] = journal
+    _set_pages( bib )
+    #Remove empty keys - except those in the required keys list.
+    for k, v in bib.items():
+        if not v:
+            if k in REQUIRED_KEYS:
+                bib[k] = 'Unknown'
+            else:
+                del bib[k]
+    for k in REQUIRED_KEYS:
+        bib.setdefault( k, 'Unknown' )
+    bib['_openurl'] = to_openurl( bib )
+    return bib
+
+def _set_pages( bib ):
+    """ Sets pages, start_page and end_page the way OpenURLParser.pages() does.
+        SP, read as pages, is the whole page range from write_ris(),
+        '125 - 141', or from other writers '125-141', or just the start page.
+        Called by ris_to_bib() """
+    pages = bib.pop( 'pages', None )
+    start = pages
+    end = bib.get( 'end_page' )
+    match = PAGE_RANGE.match( pages.strip() ) if pages else None
+    if match and not end:
+        start, end = [ p for p in match.groups() if p is not None ]
+        bib['pages'] = '%s - %s' % ( start, end )
+    elif start or end:
+        bib['pages'] = '%s - %s' % ( start or '?', end or 'EOA' )
+        start = start or '?'
+        end = end or 'EOA'
+    bib['start_page'] = start
+    bib['end_page'] = end
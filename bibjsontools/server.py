@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+A small link-resolver HTTP service in front of from_openurl.
+
+    $ python -m bibjsontools.server --port 8080 --workers 8
+
+    GET /bibjson?<openurl>    BibJSON
+    GET /ris?<openurl>        RIS
+    GET /openurl?<openurl>    the normalized OpenURL
+    GET /metrics              request, error, rejection, active connection, latency
+                              and cache counters
+
+Connections are handed to a fixed pool of worker threads through a bounded
+queue; when the queue is full new connections get a 503 straight away
+instead of piling up.  HTTP/1.1 keep-alive is supported, but a kept-alive
+connection only holds its worker for idle_timeout (a second by default)
+waiting for the next request; requests themselves get the longer
+timeout.  Results are cached with OpenURLCache.
+
+This is Python 2, so asyncio isn't available; the stdlib BaseHTTPServer
+and a thread pool do the same job without extra dependencies.
+"""
+
+import argparse, json, logging, threading, time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from Queue import Empty, Full, Queue
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from queue import Empty, Full, Queue
+
+from bibjsontools import jsonl, ris
+from bibjsontools.cache import OpenURLCache
+
+log = logging.getLogger( 'bibjsontools' )
+
+REJECTED = (b'HTTP/1.1 503 Service Unavailable\r\n'
+            b'Content-Length: 0\r\n'
+            b'Retry-After: 1\r\n'
+            b'Connection: close\r\n\r\n')
+
+
+def render(bib, fmt):
+    """
+    Returns (content type, body) for a bibjson object.
+    """
+    if fmt == 'ris':
+        return 'application/x-research-info-systems; charset=utf-8', ris.convert(bib) + 'ER  - \n'
+    elif fmt == 'openurl':
+        return 'text/plain; charset=utf-8', bib['_openurl']
+    return 'application/json', jsonl.dumps(bib)
+
+
+class Metrics(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        #Connections being served by a worker.
+        self.active = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds, error=False):
+        with self.lock:
+            self.requests += 1
+            self.seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if error:
+                self.errors += 1
+
+    def reject(self):
+        with self.lock:
+            self.rejected += 1
+
+    def busy(self, change):
+        with self.lock:
+            self.active += change
+
+    def snapshot(self):
+        with self.lock:
+            return {'requests': self.requests,
+                    'errors': self.errors,
+                    'rejected': self.rejected,
+                    'active': self.active,
+                    'mean_ms': (self.seconds / self.requests * 1000) if self.requests else 0.0,
+                    'max_ms': self.max_seconds * 1000}
+
+    # end class Metrics()
+
+
+class ResolverHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    #Seconds to read a request; see the server's idle_timeout for the wait
+    #between requests on a kept-alive connection.
+    timeout = 10
+    kept_alive = False
+    #Buffer the response and send it in one go, without Nagle delays.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    FORMATS = {
+        '/': 'bibjson',
+        '/bibjson': 'bibjson',
+        '/ris': 'ris',
+        '/openurl': 'openurl',
+        }
+
+    def handle_one_request(self):
+        if self.kept_alive:
+            self.connection.settimeout(self.server.idle_timeout)
+        BaseHTTPRequestHandler.handle_one_request(self)
+        self.kept_alive = True
+
+    def parse_request(self):
+        #The request line is in; the rest of the request gets the full timeout.
+        self.connection.settimeout(self.timeout)
+        return BaseHTTPRequestHandler.parse_request(self)
+
+    def do_GET(self):
+        start = time.time()
+        path, sep, query = self.path.partition('?')
+        error = False
+        if path == '/metrics':
+            status, ctype, body = 200, 'application/json', json.dumps(self.server.stats())
+        elif path in self.FORMATS:
+            try:
+                bib = self.server.cache.from_openurl(query)
+                ctype, body = render(bib, self.FORMATS[path])
+                status = 200
+            except Exception as e:
+                log.exception('could not parse %r', query)
+                status, ctype, body, error = 400, 'text/plain; charset=utf-8', '%s: %s' % (type(e).__name__, e), True
+        else:
+            status, ctype, body = 404, 'text/plain; charset=utf-8', 'not found'
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if path != '/metrics':
+            self.server.metrics.record(time.time() - start, error)
+
+    def log_message(self, format, *args):
+        log.debug(format, *args)
+
+    # end class ResolverHandler()
+
+
+class ResolverServer(HTTPServer):
+
+    def __init__(self, address, workers=4, backlog=64, cache_size=10000, idle_timeout=1.0):
+        HTTPServer.__init__(self, address, ResolverHandler)
+        self.idle_timeout = idle_timeout
+        self.cache = OpenURLCache(cache_size)
+        self.metrics = Metrics()
+        self.pending = Queue(maxsize=backlog)
+        self.workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._work, name='bibjsontools-worker-%d' % i)
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+
+    def process_request(self, request, client_address):
+        """
+        Queue the connection for a worker, or turn it away if the queue is full.
+        """
+        try:
+            self.pending.put_nowait((request, client_address))
+        except Full:
+            self.metrics.reject()
+            try:
+                request.sendall(REJECTED)
+            finally:
+                self.shutdown_request(request)
+
+    def _work(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            self.metrics.busy(1)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self.metrics.busy(-1)
+
+    def stats(self):
+        out = self.metrics.snapshot()
+        out['queued'] = self.pending.qsize()
+        out['cache'] = self.cache.stats()
+        return out
+
+    def server_close(self):
+        """
+        Close queued connections, then stop the workers and wait for them.
+        Call shutdown() first when serve_forever() runs in another thread.
+        """
+        HTTPServer.server_close(self)
+        while True:
+            try:
+                item = self.pending.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        for worker in self.workers:
+            self.pending.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    # end class ResolverServer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='OpenURL to BibJSON/RIS resolver service.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--backlog', type=int, default=64,
+                        help='connections queued for a worker before new ones get a 503')
+    parser.add_argument('--cache-size', type=int, default=10000)
+    parser.add_argument('--idle-timeout', type=float, default=1.0,
+                        help='seconds a kept-alive connection may wait for its next request')
+    args = parser.parse_args(argv)
+    server = ResolverServer((args.host, args.port), args.workers, args.backlog, args.cache_size,
+                            args.idle_timeout)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
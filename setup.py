@@ -9,6 +9,16 @@ from setuptools import find_packages, setup
 setup(
     name='bibjsontools',
     version='0.4e',
-    packages=find_packages(),
+    packages=find_packages(exclude=['bench', 'bench.*', 'test']),
     install_requires=[],
+    #argparse, collections.OrderedDict and logging.NullHandler need 2.7.
+    python_requires='>=2.7, <3',
+    classifiers=[
+        'Programming Language :: Python :: 2',
+        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 2 :: Only',
+    ],
+    entry_points={
+        'console_scripts': ['bibjsontools = bibjsontools.cli:main'],
+    },
 )
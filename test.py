@@ -3,13 +3,37 @@
 from __future__ import unicode_literals
 
 import unittest
+from test import accesslog
+from test import cache
+from test import cli
+from test import columns
+from test import fingerprint
+from test import identifiers
+from test import index
+from test import instruments
+from test import jsonl
+from test import kev
+from test import record
 from test import openurl
 from test import ris
+from test import server
 
 def suite():
     test_suite = unittest.TestSuite()
     test_suite.addTest(openurl.suite())
     test_suite.addTest(ris.suite())
+    test_suite.addTest(accesslog.suite())
+    test_suite.addTest(cache.suite())
+    test_suite.addTest(cli.suite())
+    test_suite.addTest(columns.suite())
+    test_suite.addTest(fingerprint.suite())
+    test_suite.addTest(identifiers.suite())
+    test_suite.addTest(index.suite())
+    test_suite.addTest(instruments.suite())
+    test_suite.addTest(jsonl.suite())
+    test_suite.addTest(kev.suite())
+    test_suite.addTest(record.suite())
+    test_suite.addTest(server.suite())
     return test_suite
 
 runner = unittest.TextTestRunner()
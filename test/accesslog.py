@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import gzip, io, logging, os, shutil, sys, tempfile, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools import accesslog
+except:                                 # accessed when running, eg, `python ./accesslog.py TestAccessLog.test_read`
+    sys.path.append( '../' )
+    from bibjsontools import accesslog
+from bibjsontools.cache import OpenURLCache
+from bibjsontools.openurl import from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestAccessLog(unittest.TestCase):
+
+    query = 'genre=article&atitle=Forest+products&issn=01650203&date=2002&sid=EBSCO:aph'
+    old = [
+        '10.0.0.1 - - [10/Oct/2016:13:55:36 -0700] "GET /openurl?%s HTTP/1.1" 200 512 '
+        '"http://search.example.com/" "Mozilla/5.0"' % query,
+        '10.0.0.2 - - [10/Oct/2016:13:55:37 -0700] "GET /static/logo.png HTTP/1.1" 200 2048 "-" "Mozilla/5.0"',
+    ]
+    new = [
+        '10.0.0.3 - jdoe [11/Oct/2016:08:00:00 +0000] "GET /openurl?rft.btitle=The+blind+assassin&rft.genre=book HTTP/1.1" 302 0',
+        '10.0.0.4 - - [11/Oct/2016:08:00:01 +0000] "GET /resolve?issn=01650203 HTTP/1.1" 200 10 "-" "curl/7.0"',
+        #OpenURL-looking referer and agent, but not an OpenURL request.
+        '10.0.0.5 - - [11/Oct/2016:08:00:02 +0000] "GET /search?q=elsewhere HTTP/1.1" 200 10 '
+        '"http://example.com/openurl?rft.title=x&sid=y" "bot (title=z)"',
+        'garbage line with title=x?',
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'access.log')
+        f = gzip.open(self.path + '.1.gz', 'wb')
+        f.write('\n'.join(self.old).encode('utf-8'))
+        f.close()
+        with io.open(self.path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.new) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_rotated(self):
+        io.open(self.path + '.2.gz', 'wb').close()
+        io.open(self.path + '.bak', 'wb').close()
+        self.assertEqual(accesslog.rotated(self.path),
+                         [self.path + '.2.gz', self.path + '.1.gz', self.path])
+
+    def test_read(self):
+        reader = accesslog.AccessLogReader(accesslog.rotated(self.path), path_prefix='/openurl')
+        bibs = list(reader)
+        self.assertEqual(len(bibs), 2)
+        first = dict(bibs[0])
+        meta = first.pop('_log')
+        self.assertEqual(first, from_openurl(self.query))
+        self.assertEqual(meta, {'timestamp': '2016-10-10T13:55:36-07:00',
+                                'client': '10.0.0.1',
+                                'method': 'GET',
+                                'path': '/openurl',
+                                'status': 200,
+                                'referer': 'http://search.example.com/',
+                                'agent': 'Mozilla/5.0'})
+        self.assertEqual(bibs[1]['title'], 'The blind assassin')
+        self.assertEqual(bibs[1]['_log']['user'], 'jdoe')
+        self.assertEqual(bibs[1]['_log']['status'], 302)
+        self.assertEqual(reader.stats(), {'lines': 6, 'skipped': 4, 'records': 2, 'errors': 0})
+
+    def test_any_path_and_cache(self):
+        cache = OpenURLCache()
+        reader = accesslog.AccessLogReader([self.path, self.path], parse=cache.from_openurl)
+        bibs = list(reader)
+        self.assertEqual([b['_log']['path'] for b in bibs], ['/openurl', '/resolve'] * 2)
+        self.assertEqual(cache.stats()['hits'], 2)
+        #Cached records aren't shared between log lines.
+        self.assertFalse(bibs[0] is bibs[2])
+        self.assertEqual(reader.stats()['skipped'], 4)
+
+    def test_wanted(self):
+        reader = accesslog.AccessLogReader([], path_prefix='/openurl')
+        self.assertTrue(reader.wanted(self.old[0].encode('utf-8')))
+        self.assertFalse(reader.wanted(self.new[1].encode('utf-8')))
+        self.assertFalse(reader.wanted(self.new[2].encode('utf-8')))
+        self.assertFalse(reader.wanted(b'GET /openurl?sid=x'))
+
+    def test_errors(self):
+        def fail(query):
+            raise ValueError(query)
+        reader = accesslog.AccessLogReader([self.path], parse=fail)
+        logging.disable(logging.WARNING)
+        try:
+            self.assertEqual(list(reader), [])
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertEqual(reader.stats()['errors'], 2)
+
+    # end class TestAccessLog()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestAccessLog, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
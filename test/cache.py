@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import logging, sys, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools.cache import OpenURLCache
+except:                                 # accessed when running, eg, `python ./cache.py TestOpenURLCache.test_hit`
+    sys.path.append( '../' )
+    from bibjsontools.cache import OpenURLCache
+from bibjsontools.cache import query_key
+from bibjsontools.openurl import from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestOpenURLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = OpenURLCache(maxsize=2)
+
+    def test_hit(self):
+        q = 'volume=26&genre=article&spage=293&sid=EBSCO:aph&title=Natural+Resources+Forum&date=20021101&issue=4&issn=01650203&pid=&atitle=Forest+products'
+        bib = self.cache.from_openurl(q)
+        self.assertEqual(bib, from_openurl(q))
+        #Same query in a different order.
+        q2 = 'atitle=Forest+products&genre=article&volume=26&spage=293&sid=EBSCO:aph&title=Natural+Resources+Forum&date=20021101&issue=4&issn=01650203'
+        self.assertEqual(self.cache.from_openurl(q2), bib)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_defensive_copy(self):
+        q = 'rft.genre=book&rft.btitle=A+book&isbn=9780385475723'
+        bib = self.cache.from_openurl(q)
+        bib['identifier'].append({'type': 'doi', 'id': 'doi:1234'})
+        bib['title'] = 'Changed'
+        bib = self.cache.from_openurl(q)
+        self.assertEqual(bib['title'], 'A book')
+        self.assertEqual(len(bib['identifier']), 1)
+
+    def test_eviction(self):
+        for q in ['title=One', 'title=Two', 'title=One', 'title=Three', 'title=Two']:
+            self.cache.from_openurl(q)
+        stats = self.cache.stats()
+        #Two was least recently used when Three arrived.
+        self.assertEqual(stats['evictions'], 2)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['size'], 2)
+
+    def test_from_dict(self):
+        qdict = {'rft.genre': ['book'], 'rft.btitle': ['A book']}
+        self.cache.from_dict(qdict)
+        bib = self.cache.from_dict(dict(qdict))
+        self.assertEqual(bib['title'], 'A book')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_query_key(self):
+        self.assertEqual(query_key('b=2&a=1&rft_id=x&pid=&rft_id=y'),
+                         'a=1&b=2&rft_id=x&rft_id=y')
+
+    # end class TestOpenURLCache()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestOpenURLCache, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import gzip, io, json, logging, os, shutil, sys, tempfile, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools import cli
+except:                                 # accessed when running, eg, `python ./cli.py TestCLI.test_json`
+    sys.path.append( '../' )
+    from bibjsontools import cli
+from bibjsontools import ris
+from bibjsontools.openurl import from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestCLI(unittest.TestCase):
+
+    lines = [
+        'rft.genre=article&rft.atitle=First&rft.volume=1',
+        'http://resolver.example.edu/openurl?genre=book&title=Second&isbn=9780385475723',
+        json.dumps({'query': 'title=Third'}),
+        '',
+        json.dumps('title=Fourth'),
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.input = os.path.join(self.dir, 'in.txt.gz')
+        f = gzip.open(self.input, 'wb')
+        f.write('\n'.join(self.lines).encode('utf-8'))
+        f.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_query_from_line(self):
+        self.assertEqual(cli.query_from_line(self.lines[1]), 'genre=book&title=Second&isbn=9780385475723')
+        self.assertEqual(cli.query_from_line(self.lines[2]), 'title=Third')
+        self.assertEqual(cli.query_from_line('atitle=Why?&title=J&issn=1234-5678'), 'atitle=Why?&title=J&issn=1234-5678')
+        self.assertEqual(cli.query_from_line('/openurl?atitle=Why?&title=J'), 'atitle=Why?&title=J')
+        self.assertEqual(cli.query_from_line('https://r.example.edu/a=b/openurl?title=J'), 'title=J')
+
+    def test_json(self):
+        output = os.path.join(self.dir, 'out.jsonl')
+        errors = io.StringIO()
+        stats = cli.run([self.input], io.open(output, 'wb'), errors=errors)
+        self.assertEqual((stats['records'], stats['errors']), (4, 0))
+        bibs = [json.loads(line) for line in io.open(output, encoding='utf-8')]
+        self.assertEqual([b['title'] for b in bibs], ['First', 'Second', 'Third', 'Fourth'])
+        self.assertEqual(bibs[0], from_openurl(self.lines[0]))
+
+    def test_workers_and_formats(self):
+        out = io.BytesIO()
+        stats = cli.run([self.input], out, fmt='openurl', workers=2, chunksize=1)
+        self.assertEqual(stats['records'], 4)
+        self.assertEqual(out.getvalue().decode('utf-8').splitlines()[0],
+                         from_openurl(self.lines[0])['_openurl'])
+        out = io.BytesIO()
+        cli.run([self.input], out, fmt='ris')
+        self.assertEqual(out.getvalue().decode('utf-8').count('ER  - '), 4)
+        #The same records ris.write_ris() writes.
+        written = io.StringIO()
+        ris.write_ris([from_openurl(cli.query_from_line(line)) for line in self.lines if line], written)
+        self.assertEqual(out.getvalue().decode('utf-8'), written.getvalue())
+
+    def test_errors_counted(self):
+        out = io.BytesIO()
+        errors = io.StringIO()
+        path = os.path.join(self.dir, 'bad.txt')
+        io.open(path, 'w', encoding='utf-8').write('title=Fine\n{"query": \n{"id": 3}\n')
+        stats = cli.run([path], out, errors=errors)
+        self.assertEqual((stats['records'], stats['errors']), (3, 2))
+        self.assertTrue('record 2' in errors.getvalue())
+        self.assertTrue('record 3: ValueError: JSON object has no "query" or "url"' in errors.getvalue())
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+    def test_bad_bytes(self):
+        path = os.path.join(self.dir, 'bad.txt')
+        io.open(path, 'wb').write(b'title=Fine\ntitle=Bad\xff\ntitle=Also+fine\n')
+        out = io.BytesIO()
+        errors = io.StringIO()
+        stats = cli.run([path], out, errors=errors)
+        self.assertEqual((stats['records'], stats['errors']), (3, 1))
+        self.assertTrue('record 2: UnicodeDecodeError' in errors.getvalue())
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+        #The same with workers converting byte ranges.
+        out = io.BytesIO()
+        errors = io.StringIO()
+        stats = cli.run([path], out, workers=2, errors=errors, chunk_bytes=4)
+        self.assertEqual((stats['records'], stats['errors']), (3, 1))
+        self.assertTrue('record 2: UnicodeDecodeError' in errors.getvalue())
+
+    def test_byte_ranges(self):
+        path = os.path.join(self.dir, 'plain.txt')
+        data = '\n'.join(self.lines).encode('utf-8')
+        io.open(path, 'wb').write(data)
+        ranges = cli.byte_ranges(path, 10)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (start, end), (next_start, next_end) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(data[end - 1:end], b'\n')
+
+    def test_byte_range_workers(self):
+        plain = os.path.join(self.dir, 'plain.txt')
+        io.open(plain, 'w', encoding='utf-8').write('\n'.join(self.lines * 20) + '\n{"query": \n')
+        serial = io.BytesIO()
+        serial_stats = cli.run([plain], serial, fmt='ris', errors=io.StringIO())
+        ranged = io.BytesIO()
+        errors = io.StringIO()
+        stats = cli.run([plain, plain], ranged, fmt='ris', workers=2, errors=errors, chunk_bytes=100)
+        self.assertEqual((stats['records'], stats['errors']), (162, 2))
+        self.assertEqual(ranged.getvalue(), serial.getvalue() * 2)
+        self.assertEqual(serial_stats['records'], 81)
+        self.assertTrue('record 81: ' in errors.getvalue())
+        self.assertTrue('record 162: ' in errors.getvalue())
+
+    # end class TestCLI()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestCLI, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
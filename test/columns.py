@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import io, json, logging, os, shutil, sys, tempfile, unittest
+from array import array
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools import columns
+    from test.fixtures import QUERIES
+except:                                 # accessed when running, eg, `python ./columns.py TestColumns.test_round_trip`
+    sys.path.append( '../' )
+    from bibjsontools import columns
+    from fixtures import QUERIES
+from bibjsontools.openurl import from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'out.bjc')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        queries = QUERIES
+        self.assertEqual(columns.write_columns(queries, self.path, rows_per_group=10), len(queries))
+        groups = list(columns.read_columns(self.path))
+        full, rest = divmod(len(queries), 10)
+        self.assertEqual([g['rows'] for g in groups], [10] * full + ([rest] if rest else []))
+        types, rfrs, journals, years = [], [], [], []
+        for g in groups:
+            types += columns.decode(g['type'])
+            rfrs += columns.decode(g['_rfr'])
+            journals += columns.decode(g['journal'])
+            years += list(g['year'])
+        #The columns hold what parse() would have given.
+        for i, q in enumerate(queries):
+            bib = from_openurl(q)
+            self.assertEqual(types[i], bib['type'])
+            self.assertEqual(rfrs[i], bib.get('_rfr'))
+            self.assertEqual(journals[i], bib.get('journal', {}).get('name'))
+            self.assertEqual(years[i], int(bib['year']) if bib.get('year', '').isdigit() else 0)
+
+    def test_dictionary_encoding(self):
+        queries = ['genre=article&jtitle=Nature&issn=0028-0836&date=2001&sid=EBSCO:aph',
+                   'genre=article&jtitle=Science&date=2002',
+                   'genre=article&jtitle=Nature&issn=00280836&date=2003&sid=EBSCO:aph',
+                   'genre=book&title=Solo']
+        columns.write_columns(queries, self.path)
+        group = next(columns.read_columns(self.path))
+        codes, dictionary = group['journal']
+        self.assertEqual(list(codes), [0, 1, 0, columns.MISSING])
+        self.assertEqual(dictionary, ['Nature', 'Science'])
+        self.assertEqual(columns.decode(group['issn']), ['00280836', None, '00280836', None])
+        self.assertEqual(columns.decode(group['type']), ['article', 'article', 'article', 'book'])
+        self.assertEqual(list(group['year']), [2001, 2002, 2003, 0])
+
+    def write_group(self, header, data):
+        header = json.dumps(header).encode('utf-8')
+        with io.open(self.path, 'wb') as f:
+            f.write(columns.MAGIC + columns.HEADER_LENGTH.pack(len(header)) + header + data)
+
+    def test_other_platform(self):
+        #Written somewhere with the other byte order and 2 byte codes.
+        other = 'big' if sys.byteorder == 'little' else 'little'
+        codes = array(str('h'), [1, 0, columns.MISSING])
+        codes.byteswap()
+        self.write_group({'rows': 3, 'byteorder': other,
+                          'columns': [{'name': 'journal', 'kind': 'dictionary', 'typecode': 'h', 'itemsize': 2,
+                                       'dictionary': ['Nature', 'Science']}]},
+                         codes.tostring())
+        group = next(columns.read_columns(self.path))
+        self.assertEqual(columns.decode(group['journal']), ['Science', 'Nature', None])
+
+    def test_bad_header(self):
+        meta = {'name': 'year', 'kind': 'int32', 'typecode': 'i', 'itemsize': 4}
+        data = array(str(columns.INT32), [2001, 2002]).tostring()
+        for header, body in [({'rows': 2, 'byteorder': 'middle', 'columns': [meta]}, data),
+                             ({'rows': 2, 'byteorder': sys.byteorder, 'columns': [dict(meta, typecode='d')]}, data),
+                             ({'rows': 2, 'byteorder': sys.byteorder, 'columns': [dict(meta, itemsize=3)]}, data),
+                             ({'rows': 2, 'byteorder': sys.byteorder, 'columns': [meta]}, data[:6])]:
+            self.write_group(header, body)
+            self.assertRaises(ValueError, list, columns.read_columns(self.path))
+        self.write_group({'rows': 2, 'byteorder': sys.byteorder, 'columns': [meta]}, data)
+        self.assertEqual(list(next(columns.read_columns(self.path))['year']), [2001, 2002])
+
+    def test_not_a_column_file(self):
+        with io.open(self.path, 'wb') as f:
+            f.write(b'{"type": "book"}\n')
+        self.assertRaises(ValueError, list, columns.read_columns(self.path))
+
+    # end class TestColumns()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestColumns, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import logging, sys, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools.fingerprint import fingerprint, fingerprint_openurl
+    from test.fixtures import QUERIES
+except:                                 # accessed when running, eg, `python ./fingerprint.py TestFingerprint.test_aliases`
+    sys.path.append( '../' )
+    from bibjsontools.fingerprint import fingerprint, fingerprint_openurl
+    from fixtures import QUERIES
+from bibjsontools.openurl import from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_doi_aliases(self):
+        a = 'rft.genre=article&rft.atitle=Manipulation&rft_id=info:doi/10.1039/b814549k&rft.volume=1'
+        b = 'doi=10.1039/B814549K&atitle=Manipulation&genre=article'
+        self.assertEqual(fingerprint_openurl(a), fingerprint_openurl(b))
+
+    def test_citation_fields(self):
+        a = 'rft.atitle=Forest+products%3A+Economic&rft.date=2002-11-01&rft.volume=26&rft.spage=293&rft.issn=0165-0203'
+        b = 'spage=293&volume=26&date=2002&atitle=Forest+Products+-+economic&issn=01650203'
+        self.assertEqual(fingerprint_openurl(a), fingerprint_openurl(b))
+        c = 'spage=294&volume=26&date=2002&atitle=Forest+Products+-+economic&issn=01650203'
+        self.assertNotEqual(fingerprint_openurl(a), fingerprint_openurl(c))
+
+    def test_isbn_10_and_13(self):
+        self.assertEqual(fingerprint_openurl('isbn=0385475721&title=The+blind+assassin'),
+                         fingerprint_openurl('rft.isbn=978-0-385-47572-3'))
+
+    def test_chapters(self):
+        one = 'genre=bookitem&isbn=9780393066005&atitle=Chapter+One&spage=1'
+        two = 'genre=bookitem&isbn=9780393066005&atitle=Chapter+Two&spage=50'
+        self.assertNotEqual(fingerprint_openurl(one), fingerprint_openurl(two))
+        self.assertEqual(fingerprint_openurl(one), fingerprint_openurl('rft.genre=bookitem&rft.atitle=Chapter+one&rft.spage=1&rft.isbn=0393066002'))
+        #A DOI still stands for the chapter on its own.
+        self.assertEqual(fingerprint_openurl(one + '&doi=10.1/ch1'), fingerprint_openurl('genre=bookitem&doi=10.1/CH1'))
+
+    def test_articles_sharing_isbn(self):
+        a = 'genre=article&atitle=Paper+A&isbn=9780393066005'
+        b = 'genre=article&atitle=Paper+B&isbn=9780393066005'
+        self.assertNotEqual(fingerprint_openurl(a), fingerprint_openurl(b))
+        self.assertNotEqual(fingerprint(from_openurl(a)), fingerprint(from_openurl(b)))
+        self.assertEqual(fingerprint_openurl(a), fingerprint_openurl('rft.genre=article&rft.isbn=0393066002&rft.atitle=Paper+a'))
+        #The book itself is still just its ISBN.
+        self.assertEqual(fingerprint_openurl('genre=book&isbn=9780393066005&title=Whole+book'),
+                         fingerprint_openurl('isbn=0393066002'))
+
+    def test_id_order(self):
+        self.assertEqual(fingerprint_openurl('isbn=9780393066005 9780385475723&title=T'),
+                         fingerprint_openurl('isbn=9780385475723 9780393066005&title=T'))
+
+    def test_matches_parsed(self):
+        for q in QUERIES:
+            self.assertEqual(fingerprint_openurl(q), fingerprint(from_openurl(q)))
+            self.assertEqual(fingerprint_openurl(q), fingerprint(from_openurl(q, compact=True)))
+
+    # end class TestFingerprint()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestFingerprint, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import logging, sys, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools import identifiers
+except:                                 # accessed when running, eg, `python ./identifiers.py TestNormalize.test_isbn`
+    sys.path.append( '../' )
+    from bibjsontools import identifiers
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestClassify(unittest.TestCase):
+
+    def classify(self, key, value):
+        return list(identifiers.classify(key, value))
+
+    def test_rft_id(self):
+        self.assertEqual(self.classify('rft_id', 'info:doi/10.1039/b814549k'),
+                         [{'type': 'doi', 'id': 'doi:10.1039/b814549k'}])
+        self.assertEqual(self.classify('id', 'pmid:18539564'),
+                         [{'type': 'pmid', 'id': 'info:pmid/18539564'}])
+        self.assertEqual(self.classify('rft_id', 'info:oclcnum/6104671'), [])
+        #Blank dois
+        self.assertEqual(self.classify('id', 'doi:'), [])
+
+    def test_repeated_isbn(self):
+        self.assertEqual(self.classify('rft.isbn', '9780385475723 0385475721'),
+                         [{'type': 'isbn', 'id': '9780385475723'},
+                          {'type': 'isbn', 'id': '0385475721'}])
+
+    def test_pull_oclc(self):
+        odict = {'rfr_id': ['info:sid/firstsearch.oclc.org:WorldCat'],
+                 'rfe_dat': ['<accessionnumber>6104671</accessionnumber>']}
+        self.assertEqual(identifiers.pull_oclc(odict), '6104671')
+        self.assertEqual(identifiers.pull_oclc({'rfr_id': ['info:sid/firstsearch.oclc.org:WorldCat']}), None)
+
+    # end class TestClassify()
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_isbn(self):
+        self.assertEqual(identifiers.normalize('isbn', '0-385-47572-1'), '9780385475723')
+        self.assertEqual(identifiers.normalize('isbn', '978-0-385-47572-3'), '9780385475723')
+        self.assertEqual(identifiers.normalize('isbn', '0-8044-2957-X'), '9780804429573')
+        #Not an ISBN-10 - left as it is, without the punctuation.
+        self.assertEqual(identifiers.normalize('isbn', 'XXXXXXXXXX'), 'XXXXXXXXXX')
+        self.assertEqual(identifiers.normalize('isbn', '12345X7890'), '12345X7890')
+
+    def test_issn(self):
+        self.assertEqual(identifiers.normalize('issn', '1757-9694'), '17579694')
+        self.assertEqual(identifiers.normalize('eissn', '0002-782x'), '0002782X')
+
+    def test_doi(self):
+        self.assertEqual(identifiers.normalize('doi', 'doi:10.1039/B814549K'), '10.1039/b814549k')
+        self.assertEqual(identifiers.normalize('doi', 'https://doi.org/10.1039/b814549k'), '10.1039/b814549k')
+
+    def test_canonical(self):
+        idts = [{'type': 'isbn', 'id': '0385475721'},
+                {'type': 'isbn', 'id': '9780385475723'},
+                {'type': 'pmid', 'id': 'info:pmid/18539564'},
+                {'type': 'oclc', 'id': 'ocm06104671'}]
+        self.assertEqual(identifiers.canonical(idts),
+                         [('isbn', '9780385475723'), ('pmid', '18539564'), ('oclc', '6104671')])
+
+    # end class TestNormalize()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestClassify, 'test')
+    suite2 = unittest.makeSuite(TestNormalize, 'test')
+    all = unittest.TestSuite( (suite1, suite2) )
+    return all
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import logging, os, shutil, sys, tempfile, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools.index import IdentifierIndex
+except:                                 # accessed when running, eg, `python ./index.py TestIdentifierIndex.test_lookup`
+    sys.path.append( '../' )
+    from bibjsontools.index import IdentifierIndex
+from bibjsontools.fingerprint import fingerprint
+from bibjsontools.openurl import from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestIdentifierIndex(unittest.TestCase):
+
+    queries = [
+        'rft.genre=article&rft.atitle=Manipulation&rft_id=info:doi/10.1039/b814549k&rft.issn=1473-0197',
+        'genre=article&atitle=Forest+products&issn=01650203&eissn=1477-8947&pmid=12345',
+        'genre=book&title=The+blind+assassin&isbn=0385475721',
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'ids.db')
+        self.index = IdentifierIndex(self.path, batch=2)
+        self.bibs = [from_openurl(q) for q in self.queries]
+        self.assertEqual(self.index.add_many(self.bibs), 3)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.dir)
+
+    def test_lookup(self):
+        first, second, third = [fingerprint(b) for b in self.bibs]
+        self.assertEqual(self.index.lookup('doi', 'doi:10.1039/B814549K'), [first])
+        self.assertEqual(self.index.lookup('doi', 'https://doi.org/10.1039/b814549k'), [first])
+        self.assertEqual(self.index.lookup('pmid', 'info:pmid/12345'), [second])
+        self.assertEqual(self.index.lookup('isbn', '978-0-385-47572-3'), [third])
+        self.assertEqual(self.index.lookup('issn', '0000-0000'), [])
+
+    def test_lookup_prefix(self):
+        second = fingerprint(self.bibs[1])
+        self.assertEqual(self.index.lookup_prefix('0165-'), [('issn', '01650203', second)])
+        self.assertEqual(self.index.lookup_prefix('1'),
+                         [('issn', '14730197', fingerprint(self.bibs[0])), ('eissn', '14778947', second)])
+
+    def test_persistent(self):
+        self.assertEqual(self.index.add(self.bibs[0], record_id=lambda bib: 'mine'), 'mine')
+        self.index.close()
+        self.index = IdentifierIndex(self.path)
+        self.assertEqual(sorted(self.index.lookup('issn', '14730197')),
+                         sorted([fingerprint(self.bibs[0]), 'mine']))
+        self.assertEqual(sorted(self.index.identifiers('mine')), [('doi', '10.1039/b814549k'), ('issn', '14730197')])
+        self.assertEqual(len(self.index), 8)
+
+    def test_record_id(self):
+        bib = from_openurl('genre=book&title=No+identifiers')
+        self.assertEqual(self.index.add(bib), fingerprint(bib))
+        self.assertEqual(self.index.add(self.bibs[2]), fingerprint(self.bibs[2]))
+        self.assertRaises(ValueError, self.index.add, bib, record_id=lambda bib: None)
+        self.assertRaises(ValueError, self.index.add_many, self.bibs, record_id=lambda bib: '')
+
+    # end class TestIdentifierIndex()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestIdentifierIndex, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
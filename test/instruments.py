@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import io, json, logging, sys, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools.instruments import Instruments
+except:                                 # accessed when running, eg, `python ./instruments.py TestInstruments.test_stages`
+    sys.path.append( '../' )
+    from bibjsontools.instruments import Instruments
+from bibjsontools import openurl
+from bibjsontools.openurl import OpenURLParser, from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestInstruments(unittest.TestCase):
+
+    q = ('rft.genre=article&rft.atitle=Manipulation&jtitle=Lab+on+a+Chip&rft.aulast=Ho'
+         '&rft.spage=1044&rft.date=2009&sid=EBSCO:aph&rfe_dat=accessionnumber:123&pid=x')
+
+    def tearDown(self):
+        openurl.set_instruments(None)
+
+    def test_stages(self):
+        with Instruments() as instruments:
+            bib = from_openurl(self.q)
+            from_openurl(self.q)
+        self.assertEqual(openurl.instruments, None)
+        self.assertEqual(bib, from_openurl(self.q))
+        stats = instruments.stats()
+        stages = stats['stages']
+        self.assertEqual(sorted(stages), ['authors', 'identifiers', 'pages', 'parse', 'pull_oclc',
+                                          'rfr', 'titles', 'to_openurl', 'type'])
+        for stage in stages.values():
+            self.assertEqual(stage['calls'], 2)
+            self.assertEqual(sum(stage['histogram'].values()), 2)
+            self.assertTrue(stage['seconds'] >= 0)
+        self.assertTrue(stages['parse']['seconds'] >= stages['identifiers']['seconds'])
+        self.assertEqual(stats['keys'], {'rft.genre': 2, 'rft.atitle': 2, 'jtitle': 2, 'rft.aulast': 2,
+                                         'rft.spage': 2, 'rft.date': 2, 'sid': 2, 'rfe_dat': 2, 'pid': 2})
+
+    def test_selective_and_dump(self):
+        instruments = Instruments().attach()
+        OpenURLParser(self.q).parse(fields=['type'])
+        instruments.detach()
+        from_openurl(self.q)
+        self.assertEqual(sorted(instruments.stats()['stages']), ['parse', 'type'])
+        out = io.StringIO()
+        instruments.dump(out)
+        self.assertEqual(json.loads(out.getvalue()), instruments.stats())
+        instruments.reset()
+        self.assertEqual(instruments.stats(), {'stages': {}, 'keys': {}})
+
+    def test_detach_during_stage(self):
+        #As another thread detaching part way through a parse would.
+        instruments = Instruments().attach()
+        pull_oclc = openurl.pull_oclc
+        def detaching(data):
+            instruments.detach()
+            return pull_oclc(data)
+        openurl.pull_oclc = detaching
+        try:
+            bib = from_openurl(self.q)
+        finally:
+            openurl.pull_oclc = pull_oclc
+        self.assertEqual(bib, from_openurl(self.q))
+        stages = instruments.stats()['stages']
+        self.assertEqual(stages['pull_oclc']['calls'], 1)
+        self.assertEqual(stages['parse']['calls'], 1)
+        self.assertFalse('to_openurl' in stages)
+
+    def test_histogram_buckets(self):
+        instruments = Instruments()
+        instruments.record('x', 0.0000005)
+        instruments.record('x', 0.000003)
+        instruments.record('x', 3600)
+        self.assertEqual(instruments.stats()['stages']['x']['histogram'],
+                         {'<1us': 1, '<4us': 1, '>=1048576us': 1})
+
+    # end class TestInstruments()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestInstruments, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
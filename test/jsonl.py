@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import io, json, logging, sys, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools import jsonl
+    from test.fixtures import QUERIES
+except:                                 # accessed when running, eg, `python ./jsonl.py TestJSONL.test_writer`
+    sys.path.append( '../' )
+    from bibjsontools import jsonl
+    from fixtures import QUERIES
+from bibjsontools.openurl import OpenURLParser, from_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestJSONL(unittest.TestCase):
+
+    def setUp(self):
+        self.queries = QUERIES
+        self.bibs = [from_openurl(q) for q in self.queries]
+
+    def test_dumps(self):
+        for bib in self.bibs:
+            self.assertEqual(json.loads(jsonl.dumps(bib)), bib)
+        self.assertEqual(jsonl.encoder('json')(self.bibs[0]), json.dumps(self.bibs[0]))
+        q = self.queries[0]
+        self.assertEqual(json.loads(jsonl.dumps(from_openurl(q, compact=True))), self.bibs[0])
+        self.assertEqual(json.loads(jsonl.dumps(OpenURLParser(q).lazy())), self.bibs[0])
+
+    def test_writer(self):
+        out = io.BytesIO()
+        writer = jsonl.JSONLWriter(out, batch=4)
+        self.assertEqual(writer.write_all(self.bibs), len(self.bibs))
+        writer.flush()
+        lines = out.getvalue().decode('utf-8').split('\n')
+        self.assertEqual(lines[-1], '')
+        self.assertEqual([json.loads(line) for line in lines[:-1]], self.bibs)
+
+    def test_backends(self):
+        self.assertRaises(ValueError, jsonl.encoder, 'yaml')
+        if jsonl.ujson is None:
+            self.assertRaises(ValueError, jsonl.encoder, 'ujson')
+        else:
+            for bib in self.bibs:
+                self.assertEqual(json.loads(jsonl.encoder('ujson')(bib)), bib)
+
+    # end class TestJSONL()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestJSONL, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
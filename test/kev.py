@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import logging, sys, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools import kev
+    from test.fixtures import QUERIES
+except:                                 # accessed when running, eg, `python ./kev.py TestTokenize.test_corpus`
+    sys.path.append( '../' )
+    from bibjsontools import kev
+    from fixtures import QUERIES
+from bibjsontools.openurl import OpenURLParser, WANTED_KEYS
+try:
+    from urlparse import parse_qs
+except ImportError:
+    from cgi import parse_qs
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_wanted_only(self):
+        data, rest = kev.tokenize('rft.atitle=A+title%3A+sub&req_dat=%3Csessionid%3E0&pid=&junk', WANTED_KEYS)
+        self.assertEqual(data, {'rft.atitle': ['A title: sub']})
+        self.assertEqual(rest, [('req_dat', '%3Csessionid%3E0')])
+
+    def test_semicolons_and_repeats(self):
+        data, rest = kev.tokenize('rft_id=a;rft_id=b&rft%2Eissn=1234-5678', WANTED_KEYS)
+        self.assertEqual(data, {'rft_id': ['a', 'b'], 'rft.issn': ['1234-5678']})
+
+    def test_corpus(self):
+        """ Decoding matches parse_qs on every test suite query. """
+        for q in QUERIES:
+            data, rest = kev.tokenize(q, WANTED_KEYS)
+            self.assertEqual(kev.decode_rest(data, rest), parse_qs(q))
+            self.assertEqual(OpenURLParser(q).full_data(), parse_qs(q))
+
+    # end class TestTokenize()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestTokenize, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
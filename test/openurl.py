@@ -2,7 +2,7 @@
 
 from __future__ import unicode_literals
 
-import json, logging, pprint, sys, unittest
+import json, logging, os, pprint, subprocess, sys, unittest
 try:
     import bibjsontools  # accessed when running `python ./test.py`
 except:
@@ -10,8 +10,10 @@ except:
     import bibjsontools
 from bibjsontools import from_dict
 from bibjsontools import from_openurl
+from bibjsontools import from_openurls
 from bibjsontools import OpenURLParser
 from bibjsontools import to_openurl
+from bibjsontools.openurl import quote_value
 try:
     from urlparse import parse_qs
 except ImportError:
@@ -210,8 +212,8 @@ class TestFromOpenURL(unittest.TestCase):
         q = 'url_ver=Z39.88-2004&rft_val_fmt=info:ofi/fmt:kev:mtx:book&rft.genre=bookitem&rft.btitle=The Corsini Encyclopedia of Psychology&rft.atitle=Minnesota Multiphasic Personality Inventory&rft.date=2010-01-30&rfr_id=info:sid/wiley.com:OnlineLibrary'
         b = from_openurl(q)
         op = OpenURLParser(q)
-        genre = op._find_key(['rft.genre', 'genre'])
-        format = op._find_key(['rft_val_fmt'])
+        genre = op._field('genre')
+        format = op._field('format')
         #Check that the OpenURL pairs are parsed properly
         self.assertEqual(genre, 'bookitem')
         self.assertTrue(format.rindex('book') > 0)
@@ -241,6 +243,33 @@ class TestFromOpenURL(unittest.TestCase):
         self.assertEqual(b['author'][0]['name'], 'Barrie, J' ); self.assertEqual( type(b['author'][0]['name']), unicode)
         self.assertEqual(b['author'][0]['_minitial'], 'M' ); self.assertEqual( type(b['author'][0]['_minitial']), unicode)
 
+    def test_multiple_authors(self):
+        #Web of Science - the first author in aulast, the others in au.
+        q = 'rft.genre=article&rft.atitle=T&rft.aulast=Castillo&rft.au=Svendsen%2C+W&rft.au=Svendsen%2C+W'
+        b = from_openurl(q)
+        self.assertEqual(b['author'], [{'name': 'Svendsen, W'},
+                                       {'name': 'Castillo', 'lastname': 'Castillo'}])
+        #ProQuest - the same person in au and aulast/aufirst.
+        q = 'rft.genre=article&rft.atitle=T&rft.au=Grossman%2C+Robert+Allen&rft.aulast=Grossman&rft.aufirst=Robert'
+        b = from_openurl(q)
+        self.assertEqual(b['author'], [{'name': 'Grossman, Robert Allen', 'lastname': 'Grossman', 'firstname': 'Robert'}])
+        #Same last name, different first name - two people.
+        q = 'rft.genre=article&rft.atitle=T&rft.au=Ann+Grossman&rft.aulast=Grossman&rft.aufirst=Robert'
+        b = from_openurl(q)
+        self.assertEqual([a['name'] for a in b['author']], ['Ann Grossman', 'Grossman, Robert'])
+        #Character references in au are left alone.
+        q = 'rft.genre=article&rft.atitle=T&rft.au=Coleman,%26%2332%3BGabriella'
+        self.assertEqual(from_openurl(q)['author'], [{'name': 'Coleman,&#32;Gabriella'}])
+        #Repeated name parts pair up by position.
+        q = 'rft.genre=article&rft.atitle=T&rft.aulast=Smith&rft.aufirst=Jane&rft.aulast=Jones&rft.aufirst=Bob'
+        b = from_openurl(q)
+        self.assertEqual([a['name'] for a in b['author']], ['Smith, Jane', 'Jones, Bob'])
+
+    def test_long_author_list(self):
+        q = 'rft.genre=article&rft.atitle=T&' + '&'.join('rft.au=Author%%2C+A%d' % i for i in range(5000))
+        b = from_openurl(q + '&rft.au=Author%2C+A0')
+        self.assertEqual(len(b['author']), 5000)
+
     def test_eissn(self):
         q = 'eissn=15414159&date=2010-01-01&pages=125-141'
         b = from_openurl(q)
@@ -265,6 +294,97 @@ class TestFromOpenURL(unittest.TestCase):
         b = from_openurl(q)
         self.assertEqual(b['title'], 'Medical studies')
 
+    def test_field_index(self):
+        q = 'atitle=Short&rft.atitle=Long&rft.jtitle=Journal&issn=1234-5678&rft.issn=8765-4321'
+        b = OpenURLParser(q)
+        #rft. keys are preferred over their bare aliases.
+        self.assertEqual(b._field('atitle'), 'Long')
+        self.assertEqual(b._field('title'), 'Long')
+        self.assertEqual(b._field('jtitle'), 'Journal')
+        self.assertEqual(b._field_repeating('issn'), set(['1234-5678', '8765-4321']))
+        self.assertEqual(b._field('volume'), None)
+
+
+    def test_memoized_fields(self):
+        q = 'rft.genre=article&rft.atitle=Title&rft.volume=1&rft.spage=5'
+        b = OpenURLParser(q)
+        self.assertEqual(b.type, 'article')
+        self.assertTrue(b._shared('identifiers') is b._shared('identifiers'))
+        self.assertTrue(b._shared('pages') is b._shared('pages'))
+        #Callers get copies.
+        self.assertFalse(b.pages() is b.pages())
+        self.assertEqual(b.pages(), b._shared('pages'))
+        #Replacing the data drops memoized values.
+        b.data = parse_qs('rft.genre=book&rft.btitle=Title')
+        self.assertEqual(b.type, 'book')
+        self.assertEqual(b.pages()['start_page'], None)
+        #In place changes need an explicit invalidate.
+        b.data['rft.genre'] = ['dissertation']
+        self.assertEqual(b.type, 'book')
+        b.invalidate()
+        self.assertEqual(b.type, 'dissertation')
+
+    def test_results_not_shared(self):
+        q = 'rft.genre=article&rft.atitle=Title&rft.jtitle=J&rft.au=Smith&rft.issn=1234-5678'
+        b = OpenURLParser(q)
+        r1 = b.parse()
+        r1['author'].append({'name': 'Extra'})
+        r1['journal']['name'] = 'X'
+        del r1['identifier'][:]
+        r2 = b.parse()
+        self.assertEqual(r2, from_openurl(q))
+        self.assertEqual(r2['author'], [{'name': 'Smith'}])
+        self.assertEqual(r2['journal'], {'name': 'J'})
+        self.assertEqual(r2['identifier'], [{'type': 'issn', 'id': '1234-5678'}])
+        #Nor do changes to what the public methods return.
+        b.identifiers().append({'type': 'doi', 'id': 'doi:10.1/x'})
+        b.identifiers()[0]['id'] = 'changed'
+        b.titles()['journal']['name'] = 'X'
+        b.authors()[0]['name'] = 'X'
+        b.pages()['start_page'] = '99'
+        self.assertEqual(b.parse(), from_openurl(q))
+        self.assertEqual(b.lazy()['identifier'], [{'type': 'issn', 'id': '1234-5678'}])
+
+
+class TestTracer(unittest.TestCase):
+
+    def tearDown(self):
+        bibjsontools.set_tracer(None)
+
+    def test_events(self):
+        events = []
+        bibjsontools.set_tracer(lambda event, **fields: events.append((event, fields)))
+        bib = from_openurl('rft.genre=book&rft.btitle=A+book')
+        self.assertEqual([e[0] for e in events],
+                         ['from_openurl', 'parser.init', 'parser.parse', 'to_openurl.init', 'to_openurl.parse'])
+        self.assertEqual(events[-1][1]['openurl'], bib['_openurl'])
+
+    def test_log_tracer(self):
+        bibjsontools.set_tracer(bibjsontools.log_tracer)
+        bib = from_openurl('rft.genre=book&rft.btitle=A+book')
+        self.assertEqual(bib['title'], 'A book')
+
+
+class TestFromOpenURLs(unittest.TestCase):
+
+    queries = [
+        'rft.genre=article&rft.atitle=First&rft.volume=1',
+        'genre=book&title=Second&isbn=9780385475723',
+        'sid=EBSCO:aph&genre=article&atitle=Third&issn=01650203',
+        'rft.genre=bookitem&rft.atitle=Fourth&rft.btitle=Container',
+        'title=Fifth',
+    ]
+
+    def test_serial(self):
+        bibs = list(from_openurls(self.queries, workers=1))
+        self.assertEqual(bibs, [from_openurl(q) for q in self.queries])
+
+    def test_pool_keeps_order(self):
+        bibs = from_openurls(self.queries * 3, workers=2, chunksize=2, max_chunks=2)
+        self.assertEqual([b['title'] for b in bibs],
+                         ['First', 'Second', 'Third', 'Fourth', 'Fifth'] * 3)
+
+
 class TestThesisToOpenURL(unittest.TestCase):
     """
     Testing thesis and dissertations.  Pulled from logs May, 2014.
@@ -367,6 +487,38 @@ class TestToOpenURL(unittest.TestCase):
         self.assertTrue('Mangla, Akshay') in parsed_ourl.get('rft.au')
         self.assertTrue('2013' in parsed_ourl.get('rft.date'))
 
+class TestKEVOrder(unittest.TestCase):
+
+    def test_stable_order(self):
+        bib = {'type': 'book', 'title': 'A b\xf6ok', '_rfr': 'EBSCO:aph', 'year': '2001',
+               'author': [{'name': 'Smith, John'}],
+               'identifier': [{'type': 'isbn', 'id': '9780385475723'}]}
+        self.assertEqual(to_openurl(bib),
+                         'ctx_ver=Z39.88-2004&rft_val_fmt=info%3Aofi/fmt%3Akev%3Amtx%3Abook'
+                         '&rft.genre=book&rft.btitle=A+b%C3%B6ok&rfr_id=info%3Asid/EBSCO%3Aaph'
+                         '&rft.au=Smith%2C+John&rft.date=2001&rft.isbn=9780385475723')
+        #Key order of the input doesn't matter.
+        self.assertEqual(to_openurl(dict(reversed(list(bib.items())))), to_openurl(bib))
+
+    def test_doi_suffix(self):
+        bib = {'type': 'article', 'title': 'T', 'identifier': [{'type': 'doi', 'id': 'doi:10.1000/abcdoi'}]}
+        self.assertEqual(parse_qs(to_openurl(bib))['rft_id'], ['info:doi/10.1000/abcdoi'])
+
+    def test_trailing_newline(self):
+        #A value that is safe but for a trailing newline is still quoted.
+        bib = {'type': 'article', 'title': 'Forest products\n', 'volume': '26\n'}
+        ourl = to_openurl(bib)
+        self.assertTrue('&rft.atitle=Forest+products%0A&' in ourl)
+        self.assertTrue('&rft.volume=26%0A' in ourl)
+        self.assertEqual(parse_qs(ourl)['rft.atitle'], ['Forest products\n'])
+
+    def test_quote_value(self):
+        self.assertEqual(quote_value('a b/c'), 'a+b/c')
+        self.assertEqual(quote_value('info:sid/a&b=c'), 'info%3Asid/a%26b%3Dc')
+        self.assertEqual(quote_value('line\n'), 'line%0A')
+        self.assertEqual(quote_value('Kr\xf6ger \u2014 x'), 'Kr%C3%B6ger+%E2%80%94+x')
+
+
 class TestFromDict(unittest.TestCase):
     def test_throws_key_error(self):
         qdict = {'rfr_id': ['info:sid/libx'],
@@ -383,12 +535,73 @@ class TestFromDict(unittest.TestCase):
         b = from_dict(qdict)
         self.assertEqual(b['title'], 'Unknown')
 
+class TestLazyParse(unittest.TestCase):
+
+    q = ('rft_val_fmt=info:ofi/fmt:kev:mtx:journal&rft.genre=article&rft.atitle=Manipulation'
+         '&rft.jtitle=Lab+on+a+Chip&rft_id=info:doi/10.1039/b814549k&rft.aulast=Ho'
+         '&rft.spage=1044&rft.date=2009-01-01&sid=EBSCO:aph')
+
+    def test_fields(self):
+        full = from_openurl(self.q)
+        b = OpenURLParser(self.q)
+        routed = b.parse(fields=['type', 'identifier', 'issue'])
+        self.assertEqual(routed, {'type': full['type'], 'identifier': full['identifier']})
+        #Only the stages asked for ran.
+        self.assertEqual(sorted(b._memo), ['identifiers', 'type'])
+        self.assertEqual(from_openurl(self.q, fields=['title', '_openurl']),
+                         {'title': full['title'], '_openurl': full['_openurl']})
+        self.assertEqual(from_openurl(self.q, compact=True, fields=['year']).to_dict(), {'year': '2009'})
+        self.assertRaises(ValueError, from_openurl, self.q, fields=['titel'])
+
+    def test_lazy(self):
+        b = OpenURLParser(self.q)
+        bib = b.lazy()
+        self.assertEqual(bib['type'], 'article')
+        self.assertEqual(bib['journal'], {'name': 'Lab on a Chip'})
+        self.assertFalse('issue' in bib)
+        self.assertEqual(bib.get('issue'), None)
+        self.assertEqual(sorted(b._memo), ['titles', 'type'])
+        #Reading everything gives parse()'s output.
+        self.assertEqual(bib.to_dict(), from_openurl(self.q))
+        self.assertEqual(dict(bib), from_openurl(self.q))
+        self.assertEqual(bib['_openurl'], from_openurl(self.q)['_openurl'])
+
+    def test_lazy_unknown_title(self):
+        bib = OpenURLParser('genre=article&volume=3').lazy()
+        self.assertEqual(bib['title'], 'Unknown')
+        self.assertRaises(KeyError, lambda: bib['nonesuch'])
+
+
+class TestPackageImport(unittest.TestCase):
+
+    def run_python(self, code):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(bibjsontools.openurl.__file__)))
+        return subprocess.check_output([sys.executable, '-c', code], cwd=root).decode('utf-8').split()
+
+    def test_lazy(self):
+        out = self.run_python('import logging, sys; import bibjsontools; '
+                              'print(len(logging.getLogger().handlers)); '
+                              'print("bibjsontools.openurl" in sys.modules); '
+                              'print("urllib" in sys.modules)')
+        self.assertEqual(out, ['0', 'False', 'False'])
+        out = self.run_python('import bibjsontools.ris, sys; from bibjsontools import from_openurl; '
+                              'print(from_openurl("title=x")["title"]); '
+                              'print(bibjsontools.openurl.from_openurl is from_openurl); '
+                              'print("urllib" in sys.modules)')
+        self.assertEqual(out, ['x', 'True', 'False'])
+
+
 def suite():
     suite1 = unittest.makeSuite(TestFromOpenURL, 'test')
     suite2 = unittest.makeSuite(TestToOpenURL, 'test')
     suite3 = unittest.makeSuite(TestFromDict, 'test')
     suite4 = unittest.makeSuite(TestThesisToOpenURL, 'test')
-    all = unittest.TestSuite((suite1, suite2, suite3, suite4))
+    suite5 = unittest.makeSuite(TestFromOpenURLs, 'test')
+    suite6 = unittest.makeSuite(TestTracer, 'test')
+    suite7 = unittest.makeSuite(TestKEVOrder, 'test')
+    suite8 = unittest.makeSuite(TestLazyParse, 'test')
+    suite9 = unittest.makeSuite(TestPackageImport, 'test')
+    all = unittest.TestSuite((suite1, suite2, suite3, suite4, suite5, suite6, suite7, suite8, suite9))
     return all
 
 if __name__ == '__main__':
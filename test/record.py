@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import json, logging, pickle, sys, unittest
+from collections import Mapping
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools.record import BibRecord
+except:                                 # accessed when running, eg, `python ./record.py TestBibRecord.test_mapping`
+    sys.path.append( '../' )
+    from bibjsontools.record import BibRecord
+from bibjsontools import ris
+from bibjsontools.openurl import from_openurl, to_openurl
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestBibRecord(unittest.TestCase):
+
+    q = 'rft_val_fmt=info:ofi/fmt:kev:mtx:journal&rfr_id=info:sid/www.isinet.com:WoK:UA&rft.spage=30&rft.issue=1&rft.epage=42&rft.title=INTEGRATIVE%20BIOLOGY&rft.aulast=Castillo&rft.date=2009&rft.volume=1&rft.stitle=INTEGR%20BIOL&rft.atitle=Manipulation%20of%20biological%20samples%20using%20micro%20and%20nano%20techniques&rft.au=Svendsen%2C%20W&rft_id=info:doi/10%2E1039%2Fb814549k&rft.issn=1757-9694&rft.genre=article'
+
+    def setUp(self):
+        self.bib = from_openurl(self.q)
+        self.record = from_openurl(self.q, compact=True)
+
+    def test_mapping(self):
+        record = self.record
+        self.assertTrue(isinstance(record, BibRecord))
+        self.assertTrue(isinstance(record, Mapping))
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(sorted(record), sorted(self.bib))
+        self.assertEqual(record, self.bib)
+        self.assertEqual(record['journal']['shortcode'], 'INTEGR BIOL')
+        self.assertTrue({'type': 'issn', 'id': '1757-9694'} in record['identifier'])
+        self.assertEqual(record.get('publisher', 'none'), 'none')
+        self.assertFalse('publisher' in record)
+        self.assertRaises(KeyError, lambda: record['get'])
+
+    def test_read_only(self):
+        def assign():
+            self.record.title = 'Changed'
+        def assign_author():
+            self.record['author'][0].lastname = 'Changed'
+        def delete():
+            del self.record.title
+        self.assertRaises(AttributeError, assign)
+        self.assertRaises(AttributeError, assign_author)
+        self.assertRaises(AttributeError, delete)
+        self.assertEqual(self.record, self.bib)
+
+    def test_from_dict(self):
+        record = BibRecord.from_dict(self.bib)
+        self.assertEqual(record, self.record)
+        self.assertEqual(type(record['journal']), type(self.record['journal']))
+        self.assertEqual(type(record['author'][0]), type(self.record['author'][0]))
+
+    def test_consumers(self):
+        self.assertEqual(to_openurl(self.record), to_openurl(self.bib))
+        self.assertEqual(ris.convert(self.record), ris.convert(self.bib))
+
+    def test_to_dict(self):
+        self.assertEqual(json.loads(json.dumps(self.record.to_dict())), self.bib)
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)), self.bib)
+        self.assertEqual(pickle.loads(pickle.dumps(self.record, 2)), self.bib)
+
+    # end class TestBibRecord()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestBibRecord, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()
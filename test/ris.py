@@ -2,7 +2,7 @@
 
 from __future__ import unicode_literals
 
-import logging, pprint, sys, unittest
+import io, logging, os, pprint, sys, tempfile, unittest
 try:                                    # accessed when running `python ./test.py`
     from bibjsontools import ris
 except:                                 # accessed when running, eg, `python ./ris.py TestFromOpenURL.test_book`
@@ -107,10 +107,141 @@ class TestFromOpenURL(unittest.TestCase):
     # end class TestFromOpenURL()
 
 
+class TestWriteRIS(unittest.TestCase):
+
+    def test_multiple_records(self):
+        bibs = [
+            {'type': 'article', 'title': 'First', 'year': '2009',
+             'author': [{'name': 'Castillo, J'}, {'name': 'Svendsen, W'}],
+             'journal': {'name': 'Integrative Biology'},
+             'identifier': [{'type': 'issn', 'id': '1757-9694'}, {'type': 'issn', 'id': '1757-9708'},
+                            {'type': 'doi', 'id': 'doi:10.1039/b814549k'}]},
+            {'type': 'book', 'title': 'Second'},
+        ]
+        out = io.StringIO()
+        self.assertEqual(ris.write_ris(iter(bibs), out), 2)
+        records = out.getvalue().split('ER  - \n\n')
+        self.assertEqual(records[-1], '')
+        first = ris_chunker(records[0])
+        self.assertEqual(first[0], ('TY', 'JOUR'))
+        self.assertEqual([v for k, v in first if k == 'AU'], ['Castillo, J', 'Svendsen, W'])
+        self.assertEqual([v for k, v in first if k == 'SN'], ['1757-9694', '1757-9708'])
+        self.assertTrue(('DO', 'doi:10.1039/b814549k') in first)
+        self.assertEqual(ris_chunker(records[1]), [('TY', 'BOOK'), ('TI', 'Second')])
+
+    def test_convert_matches_dict(self):
+        q = 'rft.genre=article&rft.atitle=A+title&rft.au=First%2C+A&rft.au=Second%2C+B&rft.issn=1757-9694'
+        bib = from_openurl(q)
+        chunks = ris_chunker(ris.convert(bib))
+        self.assertEqual(len([k for k, v in chunks if k == 'AU']), 2)
+        ris_dct = RISMaker().convert_to_ris(bib)
+        self.assertEqual(ris_dct, ris.to_ris_dict(bib))
+        self.assertEqual(ris_dct['SN'], '1757-9694')
+
+    # end class TestWriteRIS()
+
+
+class TestReadRIS(unittest.TestCase):
+
+    ris_text = (
+        'TY  - JOUR\n'
+        'AU  - Castillo, J\n'
+        'AU  - Svendsen, W\n'
+        'TI  - Manipulation of biological samples\n'
+        '  using micro and nano techniques\n'
+        'JF  - INTEGRATIVE BIOLOGY\n'
+        'PY  - 2009\n'
+        'VL  - 1\n'
+        'SP  - 30\n'
+        'EP  - 42\n'
+        'SN  - 1757-9694\n'
+        'DO  - 10.1039/b814549k\n'
+        'ER  - \n'
+        '\n'
+        'TY  - BOOK\n'
+        'TI  - The blind assassin\n'
+        'SN  - 9780385475723\n'
+        'ER  - \n'
+        )
+
+    def check(self, bibs):
+        self.assertEqual(len(bibs), 2)
+        article, book = bibs
+        self.assertEqual(article['type'], 'article')
+        self.assertEqual(article['title'], 'Manipulation of biological samples using micro and nano techniques')
+        self.assertEqual(article['journal'], {'name': 'INTEGRATIVE BIOLOGY'})
+        self.assertEqual([a['lastname'] for a in article['author']], ['Castillo', 'Svendsen'])
+        self.assertEqual(article['pages'], '30 - 42')
+        self.assertEqual(article['identifier'], [{'type': 'issn', 'id': '1757-9694'},
+                                                 {'type': 'doi', 'id': 'doi:10.1039/b814549k'}])
+        self.assertEqual(book['identifier'], [{'type': 'isbn', 'id': '9780385475723'}])
+        self.assertTrue('_openurl' in book)
+
+    def test_stream(self):
+        self.check(list(ris.read_ris(io.StringIO(self.ris_text))))
+
+    def test_mmap(self):
+        fd, path = tempfile.mkstemp(suffix='.ris')
+        try:
+            os.write(fd, self.ris_text.encode('utf-8'))
+            os.close(fd)
+            self.check(list(ris.read_ris(path)))
+        finally:
+            os.remove(path)
+
+    def test_reverse_field_map(self):
+        #Whatever the writer tags, the reader maps back.
+        for k in ris.PARSE_KEYS:
+            self.assertEqual(ris.REVERSE_FIELD_MAP[ris.FIELD_MAP[k]], k)
+
+    def test_pages_and_unmapped_tags(self):
+        text = (
+            'TY  - CHAP\n'
+            'TI  - A chapter\n'
+            'SP  - 125-141\n'
+            'KW  - forests\n'
+            'Y2  - 2016/10/10\n'
+            'C3  - custom\n'
+            'J2  - NAT RES FORUM\n'
+            'ER  - \n'
+            )
+        bib = list(ris.read_ris(io.StringIO(text)))[0]
+        self.assertEqual(bib['pages'], '125 - 141')
+        self.assertEqual(bib['start_page'], '125')
+        self.assertEqual(bib['end_page'], '141')
+        self.assertEqual(sorted(bib), ['_openurl', 'end_page', 'pages', 'start_page', 'title', 'type'])
+
+    def test_page_ranges_and_ids(self):
+        def pages(sp):
+            bib = list(ris.read_ris(io.StringIO('TY  - JOUR\nTI  - T\nSP  - %s\nER  - \n' % sp)))[0]
+            return bib['start_page'], bib['end_page']
+        self.assertEqual(pages('125 - 141'), ('125', '141'))
+        self.assertEqual(pages('125--141'), ('125', '141'))
+        self.assertEqual(pages('125-141'), ('125', '141'))
+        #Hyphenated page ids are one page.
+        self.assertEqual(pages('e-123'), ('e-123', 'EOA'))
+        self.assertEqual(pages('S12-3'), ('S12-3', 'EOA'))
+        self.assertEqual(pages('12'), ('12', 'EOA'))
+
+    def test_round_trip(self):
+        q = 'volume=26&genre=article&spage=293&sid=EBSCO:aph&title=Natural+Resources+Forum&date=20021101&issue=4&issn=01650203&pid=&atitle=Forest+products+and+traditional+peoples%3a+Economic%2c+biological%2c+and+cultural+considerations.'
+        bib = from_openurl(q)
+        out = io.StringIO()
+        ris.write_ris([bib], out)
+        out.seek(0)
+        bib2 = list(ris.read_ris(out))[0]
+        for k in ('type', 'title', 'journal', 'year', 'volume', 'issue', 'pages', 'start_page', 'end_page', 'identifier'):
+            self.assertEqual(bib[k], bib2[k])
+
+    # end class TestReadRIS()
+
+
 def suite():
     suite1 = unittest.makeSuite(TestFromOpenURL, 'test')
     suite2 = unittest.makeSuite(TestRISMaker, 'test')
-    all = unittest.TestSuite( (suite1, suite2) )
+    suite3 = unittest.makeSuite(TestWriteRIS, 'test')
+    suite4 = unittest.makeSuite(TestReadRIS, 'test')
+    all = unittest.TestSuite( (suite1, suite2, suite3, suite4) )
     return all
 
 # def suite():
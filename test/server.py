@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import json, logging, socket, sys, threading, time, unittest
+try:                                    # accessed when running `python ./test.py`
+    from bibjsontools.server import ResolverServer
+except:                                 # accessed when running, eg, `python ./server.py TestServer.test_formats`
+    sys.path.append( '../' )
+    from bibjsontools.server import ResolverServer
+from bibjsontools.openurl import from_openurl
+try:
+    from httplib import HTTPConnection
+except ImportError:
+    from http.client import HTTPConnection
+
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='[%(asctime)s] %(levelname)s [%(module)s-%(funcName)s()::%(lineno)d] %(message)s', datefmt='%d/%b/%Y %H:%M:%S' )
+log = logging.getLogger('bibjsontools')
+
+
+class TestServer(unittest.TestCase):
+
+    q = 'volume=26&genre=article&spage=293&sid=EBSCO:aph&title=Natural+Resources+Forum&date=20021101&issue=4&issn=01650203&pid=&atitle=Forest+products'
+
+    def start(self, **kwargs):
+        self.server = ResolverServer(('127.0.0.1', 0), **kwargs)
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, conn, path):
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read().decode('utf-8')
+
+    def test_formats(self):
+        self.start(workers=2)
+        conn = HTTPConnection('127.0.0.1', self.port)
+        #Several requests over one keep-alive connection.
+        status, body = self.get(conn, '/bibjson?' + self.q)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), from_openurl(self.q))
+        status, body = self.get(conn, '/openurl?' + self.q)
+        self.assertEqual(body, from_openurl(self.q)['_openurl'])
+        status, body = self.get(conn, '/ris?' + self.q)
+        self.assertTrue('JF  - Natural Resources Forum' in body)
+        self.assertEqual(self.get(conn, '/nothing')[0], 404)
+        status, body = self.get(conn, '/metrics')
+        metrics = json.loads(body)
+        self.assertEqual(metrics['requests'], 4)
+        self.assertEqual(metrics['cache']['hits'], 2)
+        conn.close()
+
+    def test_backpressure(self):
+        self.start(workers=1, backlog=1)
+        #A client part way through its request holds the only worker.
+        busy = socket.create_connection(('127.0.0.1', self.port))
+        busy.sendall(b'GET /openurl?title=x HTTP/1.1\r\n')
+        for i in range(100):
+            if self.server.stats()['active']:
+                break
+            time.sleep(0.01)
+        #Waits in the queue.
+        queued = socket.create_connection(('127.0.0.1', self.port))
+        for i in range(100):
+            if self.server.pending.qsize():
+                break
+            time.sleep(0.01)
+        #Turned away.
+        conn = HTTPConnection('127.0.0.1', self.port)
+        self.assertEqual(self.get(conn, '/openurl?' + self.q)[0], 503)
+        self.assertEqual(self.server.stats()['rejected'], 1)
+        busy.close()
+        queued.close()
+
+    def test_idle_keep_alive(self):
+        self.start(workers=1, idle_timeout=0.1)
+        idle = HTTPConnection('127.0.0.1', self.port)
+        self.assertEqual(self.get(idle, '/openurl?' + self.q)[0], 200)
+        #The idle connection gives up the only worker.
+        start = time.time()
+        conn = HTTPConnection('127.0.0.1', self.port)
+        self.assertEqual(self.get(conn, '/openurl?' + self.q)[0], 200)
+        self.assertTrue(time.time() - start < 2)
+        #Requests on a connection arriving in time are still served.
+        self.assertEqual(self.get(conn, '/bibjson?' + self.q)[0], 200)
+        conn.close()
+        idle.close()
+
+    def test_close_joins_workers(self):
+        self.start(workers=3)
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertFalse([w for w in self.server.workers if w.is_alive()])
+
+    # end class TestServer()
+
+
+def suite():
+    suite1 = unittest.makeSuite(TestServer, 'test')
+    return suite1
+
+
+if __name__ == '__main__':
+    unittest.main()